@@ -1,8 +1,25 @@
 from pygef._version import __version__
-from pygef.shim import read_bore, read_cpt
+from pygef.shim import (
+    count_payloads,
+    iter_bore_xml,
+    iter_cpt_xml,
+    read_bore,
+    read_bore_header,
+    read_bores,
+    read_cpt,
+    read_cpt_header,
+    read_cpts,
+)
 
 __all__ = [
     "__version__",
     "read_cpt",
     "read_bore",
+    "read_cpt_header",
+    "read_bore_header",
+    "iter_cpt_xml",
+    "iter_bore_xml",
+    "count_payloads",
+    "read_cpts",
+    "read_bores",
 ]
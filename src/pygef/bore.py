@@ -9,7 +9,12 @@ from typing import Any
 import polars as pl
 
 from pygef.broxml.mapping import MAPPING_PARAMETERS
-from pygef.common import Location, depth_to_offset
+from pygef.common import (
+    Location,
+    depth_to_offset,
+    init_dataclass_fields,
+    is_sorted_ascending,
+)
 
 
 @dataclass(frozen=True)
@@ -29,7 +34,7 @@ class BoreData:
         delivered_vertical_position_reference_point (str): delivered vertical position reference point
         bore_rock_reached (bool): bore rock reached
         final_bore_depth (float): final bore depth
-        data (pl.DataFrame): DataFrame
+        data (pl.DataFrame): DataFrame, None if the data is not read (see `fields` of the xml readers)
             columns:
 
                 - upperBoundary [m]
@@ -76,6 +81,9 @@ class BoreData:
     alias: str | None = field(default=None)
 
     def __post_init__(self):
+        if self.data is None:
+            # the data is not resolved, e.g. only a selection of the fields is read
+            return
         # post-processing of the data
         tbl = MAPPING_PARAMETERS.dist_table().lazy()
         df = (
@@ -91,6 +99,38 @@ class BoreData:
         # bypass FrozenInstanceError
         object.__setattr__(self, "data", df)
 
+    @classmethod
+    def from_normalized(cls, **kwargs: Any) -> BoreData:
+        """
+        Create the BoreData from data that is already post-processed, e.g. the data
+        of a cached BoreData. The derived columns that are present are not computed
+        again and the data is only sorted if it is not sorted on upperBoundary.
+
+        :param kwargs: the fields of the BoreData
+        """
+        self = cls.__new__(cls)
+        init_dataclass_fields(self, kwargs)
+
+        df = self.data.collect() if isinstance(self.data, pl.LazyFrame) else self.data
+        lf = df.lazy()
+        post_process = False
+        offset = self.delivered_vertical_position_offset
+        if "upperBoundaryOffset" not in df.columns and offset is not None:
+            lf = lf.pipe(_calculate_depth_with_respect_to_offset, offset)
+            post_process = True
+        if "soilDistribution" not in df.columns:
+            tbl = MAPPING_PARAMETERS.dist_table().lazy()
+            lf = lf.join(tbl, on="geotechnicalSoilName", how="left")
+            post_process = True
+        if not is_sorted_ascending(df["upperBoundary"]):
+            lf = lf.sort("upperBoundary", descending=False, nulls_last=False)
+            post_process = True
+        if post_process:
+            df = lf.collect()
+        # bypass FrozenInstanceError
+        object.__setattr__(self, "data", df)
+        return self
+
     @property
     def columns(self) -> list[str]:
         """Columns names for the DataFrame"""
@@ -125,7 +165,8 @@ class BoreData:
         Get the attributes
         """
         attribs = copy.copy(self.__dict__)
-        attribs["data"] = attribs["data"].shape
+        if attribs["data"] is not None:
+            attribs["data"] = attribs["data"].shape
         return attribs
 
     def display_attributes(self) -> str:
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import io
-import os
+import mmap
 import re
 from pathlib import Path
-
-from lxml import etree
+from typing import Any, Collection, Iterator
 
 from pygef.bore import BoreData
 from pygef.broxml import resolvers
-from pygef.broxml.xml_parser import BaseParser, read_xml
+from pygef.broxml.validation import validate_root
+from pygef.broxml.xml_parser import (
+    iter_payloads,
+    parse_root,
+    read_xml,
+    resolve_payload,
+)
 
 # maps keyword argument to:
 # xpath: query passed to elementree.find
@@ -133,18 +138,78 @@ BORE_ATTRIBS_V2 = {
     },
 }
 
+# the layers are replaced by an empty DataFrame with the bore columns
+BORE_HEADER_ATTRIBS_V2 = {
+    **BORE_ATTRIBS_V2,
+    "data": {
+        "xpath": "./boreholeSampleDescription/bhrgtcom:descriptiveBoreholeLog",
+        "resolver": resolvers.process_bore_columns,
+    },
+}
 
-def read_bore(file: io.BytesIO | Path | str) -> list[BoreData]:
-    if isinstance(file, str) and not os.path.exists(file):
-        root = etree.fromstring(file, parser=BaseParser).getroot()
-    else:
-        root = etree.parse(file, parser=BaseParser).getroot()
+
+def read_bore(
+    file: io.BytesIO | Path | str | mmap.mmap,
+    header_only: bool = False,
+    index: int | None = None,
+    huge_tree: bool = False,
+    workers: int | None = None,
+    fields: Collection[str] | None = None,
+    validate: bool = False,
+    schema_dir: str | Path | None = None,
+) -> list[BoreData]:
+    """
+    Parse the bores of the xml file.
+
+    :param validate: validate the xml file against the schema of its namespace
+        before the bores are resolved, raises an `etree.DocumentInvalid` if the file
+        is not valid.
+    :param schema_dir: directory with a local mirror of the schemas, required to
+        validate. The schemas are never downloaded, see `validation.mirror_path`.
+    See `pygef.read_bore` and `xml_parser.read_xml` for the other parameters.
+    """
+    root = parse_root(file, huge_tree=huge_tree)
+    if validate:
+        validate_root(root, schema_dir)
+    attribs = bore_attribs(root.nsmap, header_only)
+    return read_xml(
+        root,
+        BoreData,
+        attribs,
+        "dispatchDocument",
+        index=index,
+        workers=workers,
+        fields=fields,
+    )
+
+
+def iter_bore(
+    file: io.BytesIO | Path | str | mmap.mmap,
+    header_only: bool = False,
+    huge_tree: bool = False,
+    fields: Collection[str] | None = None,
+) -> Iterator[BoreData]:
+    """
+    Iterate over the bores of the xml file, only a single dispatch document is kept
+    in memory. See `read_bore` for the parameters.
+    """
+    attribs = None
+    for payload, namespaces in iter_payloads(
+        file, "dispatchDocument", huge_tree=huge_tree
+    ):
+        if attribs is None:
+            attribs = bore_attribs(namespaces, header_only)
+        yield resolve_payload(payload, BoreData, attribs, namespaces, fields=fields)
+
+
+def bore_attribs(namespaces: dict[str, str], header_only: bool) -> dict[str, Any]:
+    """Get the resolver schema of the bhrgtcom version of the namespaces"""
     match = re.compile(r"xsd/.*/(\d\.\d)")
-    matched = match.search(root.nsmap["bhrgtcom"])
+    matched = match.search(namespaces["bhrgtcom"])
 
     if matched is None:
         raise ValueError("could not find the brhtcom version")
     else:
         if 3.0 >= float(matched.group(1)) < 2.0:
             raise ValueError("only bhrgtcom/2.x is supported ")
-        return read_xml(root, BoreData, BORE_ATTRIBS_V2, "dispatchDocument")
+        return BORE_HEADER_ATTRIBS_V2 if header_only else BORE_ATTRIBS_V2
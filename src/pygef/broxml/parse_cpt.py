@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import io
-import os
+import mmap
 from pathlib import Path
-
-from lxml import etree
+from typing import Collection, Iterator
 
 from pygef.broxml import resolvers
-from pygef.broxml.xml_parser import BaseParser, read_xml
+from pygef.broxml.validation import validate_root
+from pygef.broxml.xml_parser import (
+    iter_payloads,
+    parse_root,
+    read_xml,
+    resolve_payload,
+)
 from pygef.cpt import CPTData
 
 # maps keyword argument to:
@@ -199,10 +204,87 @@ CPT_ATTRIBS = {
     },
 }
 
+# the measurement data is replaced by an empty DataFrame with the cpt columns
+CPT_HEADER_ATTRIBS = {
+    **CPT_ATTRIBS,
+    "data": {
+        "xpath": "./conePenetrometerSurvey",
+        "resolver": resolvers.process_cpt_columns,
+    },
+}
+
+
+def read_cpt(
+    file: io.BytesIO | Path | str | mmap.mmap,
+    header_only: bool = False,
+    columns: list[str] | None = None,
+    depth_range: tuple[float, float] | None = None,
+    depth_reference: str = "penetrationLength",
+    lazy: bool = False,
+    index: int | None = None,
+    huge_tree: bool = False,
+    workers: int | None = None,
+    fields: Collection[str] | None = None,
+    validate: bool = False,
+    schema_dir: str | Path | None = None,
+) -> list[CPTData]:
+    """
+    Parse the cpts of the xml file.
+
+    :param validate: validate the xml file against the schema of its namespace
+        before the cpts are resolved, raises an `etree.DocumentInvalid` if the file
+        is not valid.
+    :param schema_dir: directory with a local mirror of the schemas, required to
+        validate. The schemas are never downloaded, see `validation.mirror_path`.
+    See `pygef.read_cpt` and `xml_parser.read_xml` for the other parameters.
+    """
+    root = parse_root(file, huge_tree=huge_tree)
+    if validate:
+        validate_root(root, schema_dir)
+    attribs = CPT_HEADER_ATTRIBS if header_only else CPT_ATTRIBS
+    return read_xml(
+        root,
+        # the data is a `LazyFrame`, collected on first access if lazy
+        CPTData.from_lazy if lazy and not header_only else CPTData,
+        attribs,
+        "dispatchDocument",
+        resolver_kwargs={
+            "columns": columns,
+            "depth_range": depth_range,
+            "depth_reference": depth_reference,
+        },
+        index=index,
+        workers=workers,
+        fields=fields,
+    )
+
 
-def read_cpt(file: io.BytesIO | Path | str) -> list[CPTData]:
-    if isinstance(file, str) and not os.path.exists(file):
-        root = etree.fromstring(file, parser=BaseParser).getroot()
-    else:
-        root = etree.parse(file, parser=BaseParser).getroot()
-    return read_xml(root, CPTData, CPT_ATTRIBS, "dispatchDocument")
+def iter_cpt(
+    file: io.BytesIO | Path | str | mmap.mmap,
+    header_only: bool = False,
+    columns: list[str] | None = None,
+    depth_range: tuple[float, float] | None = None,
+    depth_reference: str = "penetrationLength",
+    lazy: bool = False,
+    huge_tree: bool = False,
+    fields: Collection[str] | None = None,
+) -> Iterator[CPTData]:
+    """
+    Iterate over the cpts of the xml file, only a single dispatch document is kept
+    in memory. See `read_cpt` for the parameters.
+    """
+    attribs = CPT_HEADER_ATTRIBS if header_only else CPT_ATTRIBS
+    # the measurement data is copied out of the tree, such that deferred data
+    # is not affected by clearing the dispatch document
+    constructor = CPTData.from_lazy if lazy and not header_only else CPTData
+    resolver_kwargs = {
+        "columns": columns,
+        "depth_range": depth_range,
+        "depth_reference": depth_reference,
+    }
+    for payload, namespaces in iter_payloads(
+        file, "dispatchDocument", huge_tree=huge_tree
+    ):
+        yield resolve_payload(
+            payload, constructor, attribs, namespaces, resolver_kwargs, fields
+        )
@@ -2,15 +2,26 @@ from __future__ import annotations
 
 import re
 from datetime import date, datetime
-from typing import Any, List
+from typing import Any, cast
 from warnings import warn
 
 import polars as pl
 from lxml import etree
 
-from pygef.common import Location, VerticalDatumClass
+from pygef.common import (
+    Location,
+    VerticalDatumClass,
+    deferred_frame,
+    depth_range_bounds,
+    filter_depth_offset_range,
+    filter_depth_range,
+)
+from pygef.cpt import select_columns
 from pygef.gef.utils import parse_regex_cast
 
+# the ascii whitespace characters, as stripped by `bytes.strip`
+WHITESPACE = frozenset(b" \t\n\r\x0b\x0c")
+
 
 def lower_text(val: str, **kwargs: dict[Any, Any]) -> str:
     return val.lower()
@@ -47,110 +58,111 @@ def parse_bool(val: str, **kwargs: dict[Any, Any]) -> bool:
     return bool(val)
 
 
+# the columns of the bore layers: (xpath relative to the layer, value of a missing element)
+BORE_LAYER_FIELDS = {
+    "upperBoundary": ("bhrgtcom:upperBoundary", None),
+    "lowerBoundary": ("bhrgtcom:lowerBoundary", None),
+    "geotechnicalSoilNameISO": (
+        "bhrgtcom:soil/bhrgtcom:geotechnicalSoilName",
+        "niet gedefinieerd",
+    ),
+    "geotechnicalSoilNameNEN": (
+        "bhrgtcom:soil/bhrgtcom:soilNameNEN5104",
+        "niet gedefinieerd",
+    ),
+    "color": ("bhrgtcom:soil/bhrgtcom:colour", "onbekend"),
+    "dispersedInhomogeneity": ("bhrgtcom:soil/bhrgtcom:dispersedInhomogeneity", None),
+    "organicMatterContentClass": (
+        "bhrgtcom:soil/bhrgtcom:organicMatterContentClass",
+        None,
+    ),
+    "sandMedianClass": ("bhrgtcom:soil/bhrgtcom:sandMedianClass", None),
+}
+
+
 def process_bore_result(el: etree.Element, **kwargs: dict[Any, Any]) -> pl.DataFrame:
-    namespaces = kwargs["namespaces"]
-    upper_boundary = []
-    lower_boundary = []
-    geotechnical_soil_name_iso: List[str] = []
-    geotechnical_soil_name_nen: List[str] = []
-    color: List[str] = []
-    dispersed_inhomogenity: List[bool | None] = []
-    organic_matter_content_class: List[str | None] = []
-    sand_median_class: List[str | None] = []
-    for layer in el.iterfind("bhrgtcom:layer", namespaces=namespaces):
-        upper_boundary.append(
-            float(layer.find("bhrgtcom:upperBoundary", namespaces=namespaces).text)
+    namespaces = {
+        prefix: uri
+        for prefix, uri in kwargs["namespaces"].items()
+        if prefix is not None
+    }
+    layers = el.xpath("bhrgtcom:layer", namespaces=namespaces)
+    index = {layer: i for i, layer in enumerate(layers)}
+
+    # every field is collected with a single xpath query for all layers
+    columns: dict[str, list] = {}
+    schema: dict[str, Any] = {}
+    for name, (xpath, _) in BORE_LAYER_FIELDS.items():
+        columns[name], columns[f"{name}Found"] = _layer_texts(
+            el, index, xpath, namespaces
         )
-        lower_boundary.append(
-            float(layer.find("bhrgtcom:lowerBoundary", namespaces=namespaces).text)
+        schema[name] = pl.String
+        schema[f"{name}Found"] = pl.Boolean
+    df = pl.DataFrame(columns, schema=schema)
+
+    def clean(name: str) -> pl.Expr:
+        # as `clean_string`, an element without text is unknown
+        default = BORE_LAYER_FIELDS[name][1]
+        return (
+            pl.when(pl.col(f"{name}Found"))
+            .then(pl.col(name).str.replace_all(r"\W+", "").fill_null("unknown"))
+            .otherwise(pl.lit(default, dtype=pl.String))
         )
-        try:
-            geotechnical_soil_name_iso.append(
-                clean_string(
-                    layer.find(
-                        "bhrgtcom:soil/bhrgtcom:geotechnicalSoilName",
-                        namespaces=namespaces,
-                    ).text
-                )
-            )
-        except AttributeError:
-            geotechnical_soil_name_iso.append("niet gedefinieerd")
-        try:
-            geotechnical_soil_name_nen.append(
-                clean_string(
-                    layer.find(
-                        "bhrgtcom:soil/bhrgtcom:soilNameNEN5104",
-                        namespaces=namespaces,
-                    ).text
-                )
-            )
-        except AttributeError:
-            geotechnical_soil_name_nen.append("niet gedefinieerd")
-        try:
-            color.append(
-                clean_string(
-                    layer.find(
-                        "bhrgtcom:soil/bhrgtcom:colour", namespaces=namespaces
-                    ).text
-                )
-            )
-        except AttributeError:
-            color.append("onbekend")
-
-        try:
-            dispersed_inhomogenity.append(
-                parse_bool(
-                    layer.find(
-                        "bhrgtcom:soil/bhrgtcom:dispersedInhomogeneity",
-                        namespaces=namespaces,
-                    ).text
-                )
-            )
-        except AttributeError:
-            dispersed_inhomogenity.append(None)
-        try:
-            organic_matter_content_class.append(
-                clean_string(
-                    layer.find(
-                        "bhrgtcom:soil/bhrgtcom:organicMatterContentClass",
-                        namespaces=namespaces,
-                    ).text
-                )
-            )
-        except AttributeError:
-            organic_matter_content_class.append(None)
-        try:
-            sand_median_class.append(
-                clean_string(
-                    layer.find(
-                        "bhrgtcom:soil/bhrgtcom:sandMedianClass", namespaces=namespaces
-                    ).text
-                )
-            )
-        except AttributeError:
-            sand_median_class.append(None)
-
-    # merge NEN and ISO names
-    geotechnical_soil_name = [
-        word if word != "unknown" else geotechnical_soil_name_nen[i]
-        for i, word in enumerate(geotechnical_soil_name_iso)
-    ]
-    return pl.DataFrame(
-        {
-            "upperBoundary": upper_boundary,
-            "lowerBoundary": lower_boundary,
-            "geotechnicalSoilName": geotechnical_soil_name,
-            "color": color,
-            "dispersedInhomogeneity": dispersed_inhomogenity,
-            "organicMatterContentClass": organic_matter_content_class,
-            "sandMedianClass": sand_median_class,
-        }
+
+    dispersed = pl.col("dispersedInhomogeneity").str.to_lowercase()
+    return df.select(
+        pl.col("upperBoundary").cast(pl.Float64),
+        pl.col("lowerBoundary").cast(pl.Float64),
+        # merge NEN and ISO names
+        pl.when(clean("geotechnicalSoilNameISO") != "unknown")
+        .then(clean("geotechnicalSoilNameISO"))
+        .otherwise(clean("geotechnicalSoilNameNEN"))
+        .alias("geotechnicalSoilName"),
+        clean("color").alias("color"),
+        # as `parse_bool`
+        pl.when(dispersed == "ja")
+        .then(True)
+        .when(dispersed.is_in(["nee", "geen"]))
+        .then(False)
+        .otherwise(dispersed != "")
+        .alias("dispersedInhomogeneity"),
+        clean("organicMatterContentClass").alias("organicMatterContentClass"),
+        clean("sandMedianClass").alias("sandMedianClass"),
     )
 
 
-def process_cpt_result(el: etree.Element, **kwargs: dict[Any, Any]) -> pl.DataFrame:
+def _layer_texts(
+    el: etree.Element,
+    index: dict[etree.Element, int],
+    xpath: str,
+    namespaces: dict[str, str],
+) -> tuple[list[str | None], list[bool]]:
+    """
+    Get the text of the first element at the xpath of every layer.
+
+    :param el: the parent element of the layers
+    :param index: maps the layers to their position
+    :param xpath: the xpath of the element relative to the layer
+    :param namespaces: the namespaces of the xpath
+    :return: the texts and whether the element is present in the layer
     """
-    Parse the cpt data into a `DataFrame`
+    texts: list[str | None] = [None] * len(index)
+    found = [False] * len(index)
+    levels = xpath.count("/") + 1
+    for child in el.xpath(f"bhrgtcom:layer/{xpath}", namespaces=namespaces):
+        layer = child
+        for _ in range(levels):
+            layer = layer.getparent()
+        i = index[layer]
+        if not found[i]:
+            texts[i] = child.text
+            found[i] = True
+    return texts, found
+
+
+def process_cpt_result(el: etree.Element, **kwargs: dict[Any, Any]) -> pl.LazyFrame:
+    """
+    Parse the cpt data into a `LazyFrame`, it is collected by `CPTData`
 
     Parameters
     ----------
@@ -158,6 +170,11 @@ def process_cpt_result(el: etree.Element, **kwargs: dict[Any, Any]) -> pl.DataFr
         conePenetrometerSurvey
     kwargs
         namespaces.
+        columns: optional, only parse these columns and the columns required for
+            the post-processing.
+        depth_range: optional, only keep the rows within this (top, bottom) window.
+        depth_reference: optional, reference of the depth window, either
+            "penetrationLength" (default), "depth" or "depthOffset".
     """
     namespaces = kwargs["namespaces"]
 
@@ -165,14 +182,122 @@ def process_cpt_result(el: etree.Element, **kwargs: dict[Any, Any]) -> pl.DataFr
 
     text_enc = el.find(f"{prefix}/swe:encoding/swe:TextEncoding", namespaces=namespaces)
     decimal_sep = text_enc.attrib["decimalSeparator"]
-    if decimal_sep != ".":
-        warn(
-            f"Found a '{decimal_sep}' as decimal separator, this may lead to parsing errors."
-        )
-
     delimiter = text_enc.attrib["tokenSeparator"]
     new_line_char = text_enc.attrib["blockSeparator"]
+    if decimal_sep in (delimiter, new_line_char):
+        raise ValueError(
+            f"The decimal separator '{decimal_sep}' is also used as token or block "
+            "separator, the values can not be parsed."
+        )
+    # a decimal comma is parsed by polars, other decimal separators are parsed as
+    # strings and replaced by a '.' before the cast to floats
+    decimal_comma = decimal_sep == ","
+    dtype = pl.Float64 if decimal_sep in (".", ",") else pl.String
+
+    columns, selection = _parse_cpt_columns(el, namespaces)
+    projection = select_columns(columns, kwargs.get("columns"))
+    columns = [columns[i] for i in projection]
+    selection = [selection[i] for i in projection]
+
+    data = values_bytes(el.find(f"{prefix}/cptcommon:values", namespaces=namespaces))
+    schema = {f"column_{i + 1}": dtype for i in selection}
+
+    def read_values() -> pl.DataFrame:
+        # we select the columns by index, the other columns are not parsed
+        return pl.read_csv(
+            data,
+            has_header=False,
+            columns=selection,
+            schema_overrides=schema,
+            separator=delimiter,
+            eol_char=new_line_char,
+            ignore_errors=True,
+            null_values="-999999",
+            decimal_comma=decimal_comma,
+        ).select(list(schema))
+
+    # the values are parsed when the data is collected
+    lf = (
+        deferred_frame(read_values, schema)
+        .select(
+            _parse_decimal(pl.col(f"column_{i + 1}"), decimal_sep).alias(name)
+            for i, name in zip(selection, columns)
+        )
+        .drop_nulls("coneResistance")
+    )
+
+    depth_range = cast(tuple[float, float] | None, kwargs.get("depth_range"))
+    if depth_range is None:
+        return lf
+    depth_reference = cast(str, kwargs.get("depth_reference") or "penetrationLength")
+    offset = None
+    if depth_reference == "depthOffset":
+        offset = parse_float(
+            el.getparent().findtext(
+                "./deliveredVerticalPosition/cptcommon:offset", namespaces=namespaces
+            )
+        )
+    column, lower, upper = depth_range_bounds(depth_range, depth_reference, offset)
+    if column not in columns:
+        # without a depth the penetration length is used, as in `depthOffset`
+        column = "penetrationLength"
+    if depth_reference == "depthOffset":
+        # the offset is required by `depth_range_bounds`
+        return filter_depth_offset_range(lf, column, depth_range, cast(float, offset))
+    return filter_depth_range(lf, column, lower, upper)
 
+
+def values_bytes(el: etree.Element) -> bytes:
+    """
+    Get the text of the values element as utf-8 encoded bytes, without the leading
+    and trailing whitespace.
+
+    The text is serialized by lxml directly into bytes, instead of decoding it
+    into a string that is stripped and encoded again. The serialization is the
+    one copy of the text, the bytes are returned as is if the text has no
+    surrounding whitespace, as in the files of the BRO. Otherwise the trimmed
+    bytes are a second copy, polars does not read a view of the bytes.
+    """
+    data = etree.tostring(el, method="text", encoding="utf-8", with_tail=False)
+    start, end = 0, len(data)
+    while start < end and data[start] in WHITESPACE:
+        start += 1
+    while end > start and data[end - 1] in WHITESPACE:
+        end -= 1
+    if start == 0 and end == len(data):
+        return data
+    return data[start:end]
+
+
+def _parse_decimal(expr: pl.Expr, decimal_sep: str) -> pl.Expr:
+    """Cast the values with a decimal separator other than '.' or ',' to floats"""
+    if decimal_sep in (".", ","):
+        return expr
+    return expr.str.replace(decimal_sep, ".", literal=True).cast(
+        pl.Float64, strict=False
+    )
+
+
+def process_cpt_columns(el: etree.Element, **kwargs: dict[Any, Any]) -> pl.DataFrame:
+    """
+    Create an empty cpt `DataFrame` with the columns of the cpt data, the
+    measurement values are not parsed.
+
+    Parameters
+    ----------
+    el
+        conePenetrometerSurvey
+    kwargs
+        namespaces.
+    """
+    columns, _ = _parse_cpt_columns(el, kwargs["namespaces"])
+    return pl.DataFrame(schema=dict.fromkeys(columns, pl.Float64))
+
+
+def _parse_cpt_columns(
+    el: etree.Element, namespaces: dict[str, str]
+) -> tuple[list[str], list[int]]:
+    """Get the names and indices of the columns that are present in the cpt data"""
     columns = []
     selection = []
 
@@ -187,20 +312,25 @@ def process_cpt_result(el: etree.Element, **kwargs: dict[Any, Any]) -> pl.DataFr
             # this prevents materializing invalid columns
             selection.append(i)
         i += 1
+    return columns, selection
+
 
-    # we strip the data because there is leading and trailing whitespace.
-    data = el.find(f"{prefix}/cptcommon:values", namespaces=namespaces).text.strip()
-    return pl.read_csv(
-        data.encode(),
-        new_columns=columns,
-        columns=selection,
-        has_header=False,
-        schema_overrides=[pl.Float64] * len(columns),
-        separator=delimiter,
-        eol_char=new_line_char,
-        ignore_errors=True,
-        null_values="-999999",
-    ).drop_nulls("coneResistance")
+def process_bore_columns(el: etree.Element, **kwargs: dict[Any, Any]) -> pl.DataFrame:
+    """
+    Create an empty bore `DataFrame` with the columns of the bore data, the
+    layers are not parsed.
+    """
+    return pl.DataFrame(
+        schema={
+            "upperBoundary": pl.Float64,
+            "lowerBoundary": pl.Float64,
+            "geotechnicalSoilName": pl.String,
+            "color": pl.String,
+            "dispersedInhomogeneity": pl.Boolean,
+            "organicMatterContentClass": pl.String,
+            "sandMedianClass": pl.String,
+        }
+    )
 
 
 def parse_gml_location(el: etree.Element, **kwargs: dict[Any, Any]) -> Location:
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+from lxml import etree
+
+# the schemas of the BRO namespaces are published at this location
+BRO_SCHEMA_URL = "https://schema.broservices.nl/xsd/"
+
+XSI_SCHEMA_LOCATION = "{http://www.w3.org/2001/XMLSchema-instance}schemaLocation"
+
+
+class _MirrorResolver(etree.Resolver):  # type: ignore[misc]  # lxml is untyped
+    """Resolve the urls of the schemas to the files of a local mirror"""
+
+    def __init__(self, schema_dir: Path):
+        super().__init__()
+        self.schema_dir = schema_dir
+
+    def resolve(self, url, pubid, context):
+        if urlparse(url).scheme in ("http", "https"):
+            path = mirror_path(url, self.schema_dir)
+            if path.exists():
+                return self.resolve_filename(str(path), context)
+        return None
+
+
+def mirror_path(url: str, schema_dir: Path) -> Path:
+    """
+    Get the path of the schema url in the local mirror, e.g. the url
+    `https://schema.broservices.nl/xsd/dscpt/1.1/dscpt-messages.xsd` is mirrored
+    at `<schema_dir>/schema.broservices.nl/xsd/dscpt/1.1/dscpt-messages.xsd`.
+    """
+    parsed = urlparse(url)
+    return schema_dir.joinpath(parsed.netloc, *parsed.path.split("/"))
+
+
+def schema_location(root: etree.Element) -> str:
+    """
+    Get the url of the schema of the namespace of the root element.
+
+    The location in the `xsi:schemaLocation` of the root element is used if it is
+    given, otherwise the location of the messages schema of the BRO namespace,
+    e.g. `http://www.broservices.nl/xsd/dscpt/1.1` is defined by
+    `https://schema.broservices.nl/xsd/dscpt/1.1/dscpt-messages.xsd`.
+    """
+    namespace = etree.QName(root).namespace
+    if namespace is None:
+        raise ValueError("the root element of the xml file has no namespace")
+    name, version = namespace.rstrip("/").split("/")[-2:]
+    base = f"{BRO_SCHEMA_URL}{name}/{version}/"
+
+    pairs = (root.get(XSI_SCHEMA_LOCATION) or "").split()
+    locations = dict(zip(pairs[::2], pairs[1::2]))
+    if namespace in locations:
+        # a relative location is relative to the published schemas
+        return urljoin(base, locations[namespace])
+    return f"{base}{name}-messages.xsd"
+
+
+@lru_cache(maxsize=None)
+def load_schema(url: str, schema_dir: str) -> etree.XMLSchema:
+    """
+    Load and compile the schema from the local mirror of the schemas. The schemas
+    are cached, every schema is compiled once per process.
+
+    :param url: the url of the schema
+    :param schema_dir: the directory of the local mirror, see `mirror_path`
+    """
+    path = mirror_path(url, Path(schema_dir))
+    if not path.exists():
+        raise FileNotFoundError(f"the schema {url} is not found at {path}")
+    # the imported schemas are resolved to the mirror, the network is never used
+    parser = etree.XMLParser(no_network=True, resolve_entities=False)
+    parser.resolvers.add(_MirrorResolver(Path(schema_dir)))
+    return etree.XMLSchema(etree.parse(str(path), parser=parser))
+
+
+def validate_root(root: etree.Element, schema_dir: str | Path | None) -> None:
+    """
+    Validate the parsed xml file against the schema of its namespace.
+
+    :param root: the root element of the xml file
+    :param schema_dir: the directory of the local mirror of the schemas, see
+        `mirror_path`
+    :raises etree.DocumentInvalid: if the xml file is not valid
+    """
+    if schema_dir is None:
+        raise ValueError("a schema_dir is required to validate the xml file")
+    schema = load_schema(schema_location(root), str(schema_dir))
+    schema.assertValid(root)
@@ -1,6 +1,23 @@
 from __future__ import annotations
 
-from typing import Any, Callable, TypeVar, cast
+import io
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    cast,
+)
 
 from lxml import etree
 
@@ -9,7 +26,64 @@ from pygef.cpt import CPTData
 
 T = TypeVar("T", CPTData, BoreData)
 
-BaseParser = etree.XMLParser(resolve_entities=False, dtd_validation=False)
+# options of the xml parsers, the parsers never access the network
+PARSER_OPTIONS = dict(
+    resolve_entities=False,
+    dtd_validation=False,
+    no_network=True,
+)
+
+# kept for backwards compatibility, the parser is shared by all threads; the
+# readers use the parser of their thread, see `get_parser`
+BaseParser = etree.XMLParser(**PARSER_OPTIONS)
+
+# lxml parsers can not be used by several threads at once, every thread has its
+# own parsers
+_parsers = threading.local()
+
+# XPath has no default namespace, the unprefixed steps of the resolver schema xpaths
+# are qualified with this prefix if the document has a default namespace
+DEFAULT_NAMESPACE_PREFIX = "_default"
+
+# the xpaths of a resolver schema grouped by the path of their parent element:
+# [(parent xpath, [(index in the schema, child xpath, full xpath)])]
+CompiledSchema = List[
+    Tuple[Optional[etree.XPath], List[Tuple[int, etree.XPath, etree.XPath]]]
+]
+
+
+def get_parser(huge_tree: bool = False) -> etree.XMLParser:
+    """
+    Get the xml parser of the current thread.
+
+    :param huge_tree: disable the security restrictions of libxml2 on the depth
+        of the tree and the size of the text nodes, only for trusted files.
+    """
+    parsers = getattr(_parsers, "parsers", None)
+    if parsers is None:
+        parsers = _parsers.parsers = {}
+    if huge_tree not in parsers:
+        parsers[huge_tree] = etree.XMLParser(huge_tree=huge_tree, **PARSER_OPTIONS)
+    return parsers[huge_tree]
+
+
+def parse_root(
+    file: io.BytesIO | Path | str | mmap.mmap, huge_tree: bool = False
+) -> etree.Element:
+    """
+    Parse the xml file and return the root element.
+
+    :param file: path to the file, file content as string, BytesIO or a memory
+        mapped file. Memory mapped files are parsed in place without a copy.
+    :param huge_tree: disable the security restrictions of libxml2 on the depth
+        of the tree and the size of the text nodes, only for trusted files.
+    """
+    parser = get_parser(huge_tree)
+    if isinstance(file, mmap.mmap):
+        return etree.fromstring(file, parser=parser)
+    if isinstance(file, str) and not os.path.exists(file):
+        return etree.fromstring(file, parser=parser).getroot()
+    return etree.parse(file, parser=parser).getroot()
 
 
 def read_xml(
@@ -17,41 +91,281 @@ def read_xml(
     constructor: Callable[..., T],
     resolver_schema: dict[str, Any],
     payload_root: str,
+    resolver_kwargs: dict[str, Any] | None = None,
+    index: int | None = None,
+    workers: int | None = None,
+    fields: Collection[str] | None = None,
 ) -> list[T]:
+    """
+    Resolve the payloads of the payload root into objects.
+
+    :param root: the root element of the xml file
+    :param constructor: the constructor of the objects
+    :param resolver_schema: maps the keyword arguments of the constructor to the
+        xpath and the resolver of the attribute
+    :param payload_root: local name of the parent elements of the payloads, the
+        payloads are the children of every payload root, as in `iter_payloads`
+    :param resolver_kwargs: additional keyword arguments passed to the resolvers
+    :param index: only resolve the payload at this index, None resolves all payloads
+    :param workers: resolve the payloads in a pool of this number of threads, the
+        objects are returned in the order of the document. None resolves the
+        payloads one after another.
+    :param fields: only resolve these attributes, the other attributes are None.
+        None resolves all attributes.
+    """
     namespaces = root.nsmap
-    dd = root.find(payload_root, namespaces)
+    if resolver_kwargs is None:
+        resolver_kwargs = {}
+    payload_roots = list(root.iterchildren(f"{{*}}{payload_root}"))
 
     # test xml has the correct payload root
-    if dd is None:
+    if not payload_roots:
         raise SyntaxError(
             "Could not read BRO XML file, incorrect payload root. Did you obtain the data from the BRO RESTful API?"
         )
 
-    out: list[T] = []
+    payloads = [payload for dd in payload_roots for payload in dd.findall("./*")]
+    if index is not None:
+        # raises an IndexError if the payload does not exist
+        payloads = [payloads[index]]
 
-    payloads = dd.findall("./*")
-    for payload in payloads:
-        # kwargs of attribute: value
-        resolved = dict()
+    def resolve(payload: etree.Element) -> T:
+        return resolve_payload(
+            payload, constructor, resolver_schema, namespaces, resolver_kwargs, fields
+        )
+
+    if workers is not None and workers > 1 and len(payloads) > 1:
+        # the tree is only read, the compiled xpaths are thread-safe and polars
+        # releases the GIL while parsing the data
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(resolve, payloads))
+    return [resolve(payload) for payload in payloads]
+
+
+def resolve_payload(
+    payload: etree.Element,
+    constructor: Callable[..., T],
+    resolver_schema: dict[str, Any],
+    namespaces: dict[str, str],
+    resolver_kwargs: dict[str, Any] | None = None,
+    fields: Collection[str] | None = None,
+) -> T:
+    """
+    Resolve the attributes of a single payload and construct the object.
 
-        for atrib, d in resolver_schema.items():
-            d = cast(dict[str, Any], d)
-            el = payload.find(d["xpath"], payload.nsmap)
+    :param payload: the payload element, a child of the payload root
+    :param constructor: the constructor of the object
+    :param resolver_schema: maps the keyword arguments of the constructor to the
+        xpath and the resolver of the attribute
+    :param namespaces: the namespaces of the root element, passed to the resolvers
+    :param resolver_kwargs: additional keyword arguments passed to the resolvers
+    :param fields: only resolve these attributes, the other attributes are None.
+        None resolves all attributes.
+    """
+    if resolver_kwargs is None:
+        resolver_kwargs = {}
+    if fields is not None:
+        unknown = set(fields).difference(resolver_schema)
+        if unknown:
+            raise ValueError(
+                f"unknown fields {sorted(unknown)}, "
+                f"available fields are {list(resolver_schema)}"
+            )
+    schema = [
+        (atrib, d)
+        for atrib, d in resolver_schema.items()
+        if fields is None or atrib in fields
+    ]
+    elements = find_schema_elements(
+        payload,
+        compile_schema(
+            tuple(d["xpath"] for _, d in schema), tuple(payload.nsmap.items())
+        ),
+    )
+    # kwargs of attribute: value, the attributes that are not resolved are None
+    resolved: dict[str, Any] = dict.fromkeys(resolver_schema)
 
-            if el is not None:
-                if "resolver" in d:
-                    func = d["resolver"]
+    for (atrib, d), el in zip(schema, elements):
+        d = cast(dict[str, Any], d)
 
-                    if "el-attr" in d:
-                        el = getattr(el, d["el-attr"])
+        if el is not None:
+            if "resolver" in d:
+                func = d["resolver"]
 
-                    # ignore mypy error as it thinks we get a
-                    # str from the dict
-                    resolved[atrib] = func(el, namespaces=namespaces)
-                else:
-                    resolved[atrib] = el.text
+                if "el-attr" in d:
+                    el = getattr(el, d["el-attr"])
+
+                # ignore mypy error as it thinks we get a
+                # str from the dict
+                resolved[atrib] = func(el, namespaces=namespaces, **resolver_kwargs)
             else:
-                resolved[atrib] = None
-        out.append(constructor(**resolved))
+                resolved[atrib] = el.text
+    return constructor(**resolved)
+
+
+def find_schema_elements(
+    payload: etree.Element, compiled: CompiledSchema
+) -> list[etree.Element | None]:
+    """
+    Find the first element of every xpath of the compiled resolver schema, or None
+    if the xpath has no match. The parent element of every group of xpaths is
+    located once.
+    """
+    elements: list[etree.Element | None] = [None] * sum(
+        len(children) for _, children in compiled
+    )
+    for parent_xpath, children in compiled:
+        parents = [payload] if parent_xpath is None else parent_xpath(payload)
+        if not parents:
+            continue
+        for index, child_xpath, xpath in children:
+            found = child_xpath(parents[0])
+            if not found and len(parents) > 1:
+                # the first match of the xpath can be in one of the other parents
+                found = xpath(payload)
+            if found:
+                elements[index] = found[0]
+    return elements
+
+
+@lru_cache(maxsize=None)
+def compile_schema(
+    xpaths: tuple[str, ...], nsmap: tuple[tuple[str | None, str], ...]
+) -> CompiledSchema:
+    """
+    Compile the xpaths of a resolver schema for the namespaces of a document and
+    group them by the path of their parent element.
+
+    :param xpaths: the `ElementPath` expressions of the resolver schema, as passed
+        to `etree.Element.find`
+    :param nsmap: the items of the namespace map of the payload
+    """
+    namespaces = {
+        DEFAULT_NAMESPACE_PREFIX if prefix is None else prefix: uri
+        for prefix, uri in nsmap
+    }
+    qualify = None in dict(nsmap)
+
+    groups: dict[str, list[tuple[int, str, str]]] = {}
+    for index, xpath in enumerate(xpaths):
+        steps = [
+            (
+                f"{DEFAULT_NAMESPACE_PREFIX}:{step}"
+                if qualify and step != "." and ":" not in step
+                else step
+            )
+            for step in xpath.split("/")
+        ]
+        for step in steps:
+            prefix = step.partition(":")[0] if ":" in step else None
+            if prefix is not None and prefix not in namespaces:
+                # as raised by `etree.Element.find`
+                raise SyntaxError(f"prefix '{prefix}' not found in prefix map")
+        groups.setdefault("/".join(steps[:-1]), []).append(
+            (index, steps[-1], "/".join(steps))
+        )
+
+    return [
+        (
+            etree.XPath(parent, namespaces=namespaces) if parent else None,
+            [
+                (
+                    index,
+                    etree.XPath(child, namespaces=namespaces),
+                    etree.XPath(xpath, namespaces=namespaces),
+                )
+                for index, child, xpath in children
+            ],
+        )
+        for parent, children in groups.items()
+    ]
+
+
+def iter_payloads(
+    file: io.BytesIO | Path | str | mmap.mmap,
+    payload_root: str,
+    huge_tree: bool = False,
+) -> Iterator[Tuple[etree.Element, dict[str, str]]]:
+    """
+    Iterate over the payloads of the xml file without building the whole tree.
+
+    The payloads are the children of every payload root. Every payload is yielded
+    together with the namespaces of the root element once it is completely parsed,
+    and it is cleared when the next payload is requested. The processed payload
+    roots and other children of the root are removed from the tree, only a single
+    payload is kept in memory, regardless of the size of the file.
+
+    :param file: path to the file, file content as string, BytesIO or a memory
+        mapped file.
+    :param payload_root: local name of the parent element of the payloads
+    :param huge_tree: disable the security restrictions of libxml2, see `get_parser`
+    """
+    namespaces: dict[str, str] = {}
+    found = False
+    depth = 0
+    for event, el in _iterparse(file, huge_tree):
+        if event == "start":
+            if depth == 0:
+                namespaces = el.nsmap
+            elif depth == 1 and etree.QName(el).localname == payload_root:
+                found = True
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 2 and etree.QName(el.getparent()).localname == payload_root:
+            yield el, namespaces
+            # free the payload and the already processed siblings
+            el.clear(keep_tail=False)
+            parent = el.getparent()
+            while el.getprevious() is not None:
+                del parent[0]
+        elif depth == 1:
+            # free the processed children of the root, e.g. the dispatch documents
+            el.clear(keep_tail=False)
+            root = el.getparent()
+            while el.getprevious() is not None:
+                del root[0]
+
+    # test xml has the correct payload root
+    if not found:
+        raise SyntaxError(
+            "Could not read BRO XML file, incorrect payload root. Did you obtain the data from the BRO RESTful API?"
+        )
+
+
+def count_payloads(
+    file: io.BytesIO | Path | str | mmap.mmap,
+    payload_root: str = "dispatchDocument",
+    huge_tree: bool = False,
+) -> int:
+    """
+    Count the payloads of the xml file without resolving them, such that the
+    payloads can be read one at a time by their index.
+
+    The payloads are the children of every payload root, as yielded by
+    `iter_payloads` and indexed by `read_xml`. The file is parsed incrementally
+    and the payloads are cleared once counted.
+
+    :param file: path to the file, file content as string, BytesIO or a memory
+        mapped file.
+    :param payload_root: local name of the parent element of the payloads
+    :param huge_tree: disable the security restrictions of libxml2, see `get_parser`
+    """
+    return sum(1 for _ in iter_payloads(file, payload_root, huge_tree))
+
 
-    return out
+def _iterparse(
+    file: io.BytesIO | Path | str | mmap.mmap, huge_tree: bool = False
+) -> Iterator[Tuple[str, etree.Element]]:
+    """
+    Incrementally parse the xml file, yielding the start and end events. Every
+    call creates its own parser with the options of `PARSER_OPTIONS`.
+    """
+    if isinstance(file, str) and not os.path.exists(file):
+        file = io.BytesIO(file.encode())
+    elif isinstance(file, mmap.mmap):
+        file.seek(0)
+    return etree.iterparse(
+        file, events=("start", "end"), huge_tree=huge_tree, **PARSER_OPTIONS
+    )
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from dataclasses import MISSING, dataclass, fields
 from enum import Enum
-from typing import List, overload
+from typing import Any, Callable, Dict, Iterator, List, Tuple, overload
 
 import polars as pl
 from numpy.typing import NDArray
@@ -27,6 +31,25 @@ def convert_coordinate_system_to_gml(value: str) -> str:
     return "urn:ogc:def:crs:EPSG::404000"
 
 
+@contextmanager
+def map_file(path: str | os.PathLike) -> Iterator[mmap.mmap | io.BytesIO]:
+    """
+    Memory map a file read-only for the duration of the context.
+
+    An empty file can not be memory mapped, its (empty) content is returned as
+    BytesIO instead, such that it fails as any other file that is not valid.
+
+    :param path: path to the file
+    :return: the memory mapped file
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield io.BytesIO(f.read())
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
 @dataclass
 class Location:
     """DataClass that holds the standardized location information"""
@@ -50,6 +73,145 @@ class VerticalDatumClass(Enum):
     SPCS = "01000"  # SPCS
 
 
+DEPTH_REFERENCES = ("penetrationLength", "depth", "depthOffset")
+
+# margin [m] of a depth window converted from a "depthOffset" window, such that
+# no rows are lost to the rounding of the conversion
+DEPTH_OFFSET_TOLERANCE = 1e-6
+
+
+def depth_range_bounds(
+    depth_range: Tuple[float, float],
+    depth_reference: str,
+    offset: float | None,
+) -> Tuple[str, float, float]:
+    """
+    Normalize a depth window to a window in penetrationLength or depth terms.
+
+    A "depthOffset" window is widened by `DEPTH_OFFSET_TOLERANCE`, the exact window
+    is applied by `filter_depth_offset_range`.
+
+    :param depth_range: top and bottom of the window
+    :param depth_reference: one of "penetrationLength", "depth" or "depthOffset"
+    :param offset: surface reference level, required for "depthOffset"
+    :return: the reference column and the lower and upper bound of the window
+    """
+    if depth_reference not in DEPTH_REFERENCES:
+        raise ValueError(
+            f"depth_reference should be one of {DEPTH_REFERENCES}, "
+            f"got '{depth_reference}'."
+        )
+    top, bottom = depth_range
+    if depth_reference == "depthOffset":
+        if offset is None:
+            raise ValueError(
+                "A depth range wrt offset requires the vertical position offset."
+            )
+        top, bottom = offset_to_depth(top, offset), offset_to_depth(bottom, offset)
+        return (
+            "depth",
+            min(top, bottom) - DEPTH_OFFSET_TOLERANCE,
+            max(top, bottom) + DEPTH_OFFSET_TOLERANCE,
+        )
+    return depth_reference, min(top, bottom), max(top, bottom)
+
+
+def filter_depth_range(
+    lf: pl.LazyFrame, column: str, lower: float, upper: float
+) -> pl.LazyFrame:
+    """
+    Keep the rows of which the column is within the depth window.
+
+    :param lf: LazyFrame
+    :param column: reference column of the window
+    :param lower: lower bound of the window, inclusive
+    :param upper: upper bound of the window, inclusive
+    :return: LazyFrame
+    """
+    return lf.filter(pl.col(column).is_between(lower, upper))
+
+
+def filter_depth_offset_range(
+    lf: pl.LazyFrame,
+    column: str,
+    depth_range: Tuple[float, float],
+    offset: float,
+) -> pl.LazyFrame:
+    """
+    Keep the rows of which the depth with respect to the offset is within the
+    window of a "depthOffset" depth_range.
+
+    The depthOffset is computed from the column as `CPTData` does, such that the
+    rows on the edges of the window are not lost to the rounding of the window
+    that is converted by `depth_range_bounds`.
+
+    :param lf: LazyFrame
+    :param column: depth column of the depthOffset, "depth" or "penetrationLength"
+    :param depth_range: top and bottom of the window with respect to the offset
+    :param offset: surface reference level
+    :return: LazyFrame
+    """
+    top, bottom = depth_range
+    return lf.filter(
+        (offset - pl.col(column)).is_between(min(top, bottom), max(top, bottom))
+    )
+
+
+def deferred_frame(
+    function: Callable[[], pl.DataFrame], schema: Dict[str, Any]
+) -> pl.LazyFrame:
+    """
+    Get a LazyFrame of which the data is created by the function when the frame is
+    collected, like `pl.defer` of the newer versions of polars.
+
+    :param function: creates the DataFrame, called once per collect
+    :param schema: the schema of the created DataFrame
+    :return: LazyFrame
+    """
+    return pl.LazyFrame(schema=schema).map_batches(
+        lambda _: function(),
+        schema=schema,
+        predicate_pushdown=False,
+        projection_pushdown=False,
+        slice_pushdown=False,
+    )
+
+
+def init_dataclass_fields(instance: Any, kwargs: Dict[str, Any]) -> None:
+    """
+    Set the fields of a (frozen) dataclass instance without calling `__init__` and
+    `__post_init__`. The defaults of the fields are used for missing arguments.
+
+    :param instance: dataclass instance, e.g. created with `cls.__new__(cls)`
+    :param kwargs: values of the fields
+    """
+    unexpected = set(kwargs).difference(f.name for f in fields(instance))
+    if unexpected:
+        raise TypeError(f"Got unexpected keyword arguments: {sorted(unexpected)}")
+    for f in fields(instance):
+        if f.name in kwargs:
+            value = kwargs[f.name]
+        elif f.default is not MISSING:
+            value = f.default
+        elif f.default_factory is not MISSING:
+            value = f.default_factory()
+        else:
+            raise TypeError(f"Missing keyword argument: '{f.name}'")
+        # bypass FrozenInstanceError
+        object.__setattr__(instance, f.name, value)
+
+
+def is_sorted_ascending(series: pl.Series) -> bool:
+    """
+    Check if the series is sorted ascending. The sorted flag of the series is
+    used if it is set, otherwise the series is scanned once.
+
+    :param series: Series
+    :return: True if the series is sorted ascending
+    """
+    return series.flags["SORTED_ASC"] or series.is_sorted()
+
+
 def assign_multiple_columns(
     df: pl.DataFrame, columns: List[str], partial_df: pl.DataFrame
 ) -> pl.DataFrame:
@@ -4,11 +4,17 @@ import copy
 import pprint
 from dataclasses import dataclass, field
 from datetime import date
-from typing import Any, List
+from typing import Any, Iterable, List
 
 import polars as pl
 
-from pygef.common import Location, VerticalDatumClass, depth_to_offset
+from pygef.common import (
+    Location,
+    VerticalDatumClass,
+    depth_to_offset,
+    init_dataclass_fields,
+    is_sorted_ascending,
+)
 
 
 @dataclass(frozen=True)
@@ -56,8 +62,9 @@ class CPTData:
         zlm_pore_pressure_u2_after (float | None): zlm_pore_pressure_u2_after
         zlm_pore_pressure_u3_after (float | None): zlm_pore_pressure_u3_after
         column_void_mapping (dict | None): column_void_mapping
+        column_void_count (dict | None): number of void values per column
         raw_headers (dict): headers
-        data (pl.DataFrame): DataFrame
+        data (pl.DataFrame): DataFrame, None if the data is not read (see `fields` of the xml readers)
             columns:
 
                 - penetrationLength [m]
@@ -145,27 +152,123 @@ class CPTData:
 
     alias: str | None = field(default=None)
     raw_headers: dict = field(default_factory=dict)
+    column_void_count: dict | None = field(default=None)
+    # the plan of deferred data, until it is collected on the first access of `data`
+    _lazy_data: pl.LazyFrame | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
-        # post-processing of the data
-        df = (
-            self.data.lazy()
-            .pipe(
+        if self.data is None:
+            # the data is not resolved, e.g. only a selection of the fields is read
+            return
+        # post-processing of the data, the data can be a `LazyFrame` with the
+        # parsing of the data, such that the whole plan is collected once
+        df = self._post_processing_plan().collect()
+        # bypass FrozenInstanceError
+        object.__setattr__(self, "data", df)
+
+    def _post_processing_plan(self) -> pl.LazyFrame:
+        """Lazy plan of the data with the derived columns, sorted on penetrationLength"""
+        lf = self.data.lazy()
+        columns = lf.collect_schema().names()
+        return (
+            lf.pipe(
                 _calculate_depth_with_respect_to_offset,
                 self.delivered_vertical_position_offset,
-                self.data.columns,
+                columns,
             )
-            .pipe(_calculate_friction_number, self.data.columns)
+            .pipe(_calculate_friction_number, columns)
             .sort("penetrationLength", descending=False, nulls_last=False)
-            .collect()
         )
+
+    @classmethod
+    def from_lazy(cls, **kwargs: Any) -> CPTData:
+        """
+        Create the CPTData with deferred data. The `data` field is a `LazyFrame`
+        (e.g. with the parsing of the measurements) that is only collected, together
+        with the post-processing, on the first access of `CPTData.data`.
+        Use `CPTData.lazy_data` to build on the plan without collecting it.
+
+        :param kwargs: the fields of the CPTData
+        """
+        self = cls.__new__(cls)
+        init_dataclass_fields(self, kwargs)
+        if self.data is None:
+            return self
+        # bypass FrozenInstanceError
+        object.__setattr__(self, "_lazy_data", self._post_processing_plan())
+        # the data is collected by `__getattr__` on the first access
+        del self.__dict__["data"]
+        return self
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes that are not found, i.e. the deferred data.
+        # `__dict__` is used, as the fields are not set during unpickling
+        lazy_data = self.__dict__.get("_lazy_data")
+        if name != "data" or lazy_data is None:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        df = lazy_data.collect()
+        # bypass FrozenInstanceError
+        object.__setattr__(self, "data", df)
+        object.__setattr__(self, "_lazy_data", None)
+        return df
+
+    @property
+    def lazy_data(self) -> pl.LazyFrame | None:
+        """
+        The data as `LazyFrame`, deferred data is not collected. None if the data
+        is not read.
+        """
+        if self._lazy_data is not None:
+            return self._lazy_data
+        if self.data is None:
+            return None
+        return self.data.lazy()
+
+    @classmethod
+    def from_normalized(cls, **kwargs: Any) -> CPTData:
+        """
+        Create the CPTData from data that is already post-processed, e.g. the data
+        of a cached CPTData. The derived columns that are present are not computed
+        again and the data is only sorted if it is not sorted on penetrationLength.
+
+        :param kwargs: the fields of the CPTData
+        """
+        self = cls.__new__(cls)
+        init_dataclass_fields(self, kwargs)
+
+        df = self.data.collect() if isinstance(self.data, pl.LazyFrame) else self.data
+        lf = df.lazy()
+        post_process = False
+        offset = self.delivered_vertical_position_offset
+        if "depthOffset" not in df.columns and offset is not None:
+            lf = lf.pipe(_calculate_depth_with_respect_to_offset, offset, df.columns)
+            post_process = True
+        if "frictionRatioComputed" not in df.columns and {
+            "localFriction",
+            "coneResistance",
+        }.issubset(df.columns):
+            lf = lf.pipe(_calculate_friction_number, df.columns)
+            post_process = True
+        if not is_sorted_ascending(df["penetrationLength"]):
+            lf = lf.sort("penetrationLength", descending=False, nulls_last=False)
+            post_process = True
+        if post_process:
+            df = lf.collect()
         # bypass FrozenInstanceError
         object.__setattr__(self, "data", df)
+        return self
 
     @property
     def columns(self) -> list[str]:
-        """Columns names for the DataFrame"""
-        return self.data.columns
+        """Columns names for the DataFrame, empty if the data is not read"""
+        lazy_data = self.lazy_data
+        if lazy_data is None:
+            return []
+        return lazy_data.collect_schema().names()
 
     @property
     def groundwater_level_offset(self) -> float | None:
@@ -196,7 +299,10 @@ class CPTData:
         Get the attributes
         """
         attribs = copy.copy(self.__dict__)
-        attribs["data"] = attribs["data"].shape
+        # the shape of deferred data is unknown until it is collected
+        attribs.pop("_lazy_data", None)
+        data = attribs.get("data")
+        attribs["data"] = None if data is None else data.shape
         return attribs
 
     def display_attributes(self) -> str:
@@ -206,6 +312,26 @@ class CPTData:
         return pprint.pformat(self.attributes())
 
 
+# columns that are always parsed when present, the post-processing depends on them
+POST_PROCESSING_COLUMNS = ["penetrationLength", "coneResistance", "depth"]
+
+
+def select_columns(available: List[str], columns: Iterable[str] | None) -> List[int]:
+    """
+    Select the indices of the available columns that are requested or that are
+    required for the post-processing of the CPT data.
+    Requested columns that are not available are ignored.
+
+    :param available: column names in the cpt data
+    :param columns: requested column names, None selects all columns
+    :return: indices of the selected columns
+    """
+    if columns is None:
+        return list(range(len(available)))
+    selected = set(columns).union(POST_PROCESSING_COLUMNS)
+    return [i for i, name in enumerate(available) if name in selected]
+
+
 def _calculate_friction_number(lf: pl.LazyFrame, columns: List[str]) -> pl.LazyFrame:
     """Post-process function for CPT data, creates a new column with the computed frictionRatio"""
     if "localFriction" in columns and "coneResistance" in columns:
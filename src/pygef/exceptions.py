@@ -22,3 +22,19 @@ class ParseCptGefError(ParseGefError):
     def __init__(self, *args, **kwargs):
         msg = "for CPT data"
         UserError.__init__(self, concat_args(msg, args), **kwargs)
+
+
+class ReadError(UserError):
+    """
+    Error of a single file of a batch that is returned instead of raised, see
+    `read_cpts` and `read_bores`. The error only keeps the message of the original
+    error, such that it can be sent between processes.
+    """
+
+    def __init__(self, source, message: str):
+        UserError.__init__(self, source, message)
+        self.source = source
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"could not read {self.source!r}: {self.message}"
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import logging
+import mmap
 import re
+import string
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Union
+from itertools import repeat
+from typing import IO, Dict, List, Tuple, Union
 
 import polars as pl
 from gef_file_to_map import gef_to_map
@@ -13,6 +16,11 @@ from pygef.gef import utils
 
 logger = logging.getLogger(__name__)
 
+# horizontal whitespace, i.e. whitespace that does not end a line
+_HORIZONTAL_WHITESPACE = " \t\x0b\x0c"
+# the end of header line, including the line ending and any blank lines after it
+_END_OF_HEADER = re.compile(rb"^#EOH[^\n]*(\n[\r\n]*|$)", re.MULTILINE)
+
 
 class _Gef:
     """
@@ -24,29 +32,36 @@ class _Gef:
         """
         Base class of gef parser. It switches between the cpt or borehole parser.
 
-        It takes as input either the path to the gef file or the gef file as string.
+        It takes as input either the path to the gef file or the gef file as string
+        or bytes. Files and bytes are parsed without decoding the data block.
 
         Parameters
         ----------
         path: str
             Path to the *.gef file.
-        string: str
-            String version of the *.gef file.
+        string: str | bytes | mmap.mmap
+            String or bytes version of the *.gef file, or the memory mapped file.
 
         """
         self.path = path
-        self.df = None
         self.net_surface_area_quotient_of_the_cone_tip = None
         self.pre_excavated_depth = None
 
         if string is None:
-            with open(path, encoding="utf-8", errors="ignore") as f:
+            with open(path, "rb") as f:
                 string = f.read()
 
         self.s = string
 
-        # Use the Rust optimized header parser
-        self._data, self._headers = gef_to_map(string)
+        if isinstance(string, str):
+            # Use the Rust optimized header parser
+            self._data, headers = gef_to_map(string)
+        else:
+            # Only the header is decoded, the data block is kept as bytes
+            header, self._data = split_header(string)
+            _, headers = gef_to_map(header)
+        # index the headers once for the keyed lookups of the header parsers
+        self._headers = utils.HeaderIndex(headers)
 
         self.zid = utils.parse_zid_as_float(self._headers)
         self.height_system = utils.parse_height_system(self._headers)
@@ -108,75 +123,222 @@ class _Gef:
 
     @staticmethod
     def parse_data(
-        data_s: str,
+        data_s: str | bytes,
         col_separator: str,
         rec_separator: str,
         column_names: List[str],
+        columns: List[int] | None = None,
     ) -> pl.DataFrame:
         """
         Parses all data in the data string, returns a pl.DataFrame
 
         Parameters
         ----------
-        data_s: str
-            A string with the measurement data, in Delimiter-separated format.
+        data_s: str | bytes
+            The measurement data, in Delimiter-separated format.
         col_separator: str
             The character that separates the columns
         rec_separator: str
             The character that separates the records/rows
         column_names: List[str]
             List of column names
+        columns: List[int] | None
+            Indices of the columns to parse, the column names belong to these
+            columns. Defaults to the first `len(column_names)` columns.
 
         Returns
         -------
         df: pl.DataFrame
             The DataFrame with measurement data
         """
-
-        # Remove all horizontal whitespace characters around the column separator
-        new_data = re.sub(
-            rf"[^\S\r\n]*{re.escape(col_separator)}[^\S\r\n]*",
-            col_separator,
-            data_s,
-        )
-
-        # Split string by record separator into lines
-        # Remove all whitespaces and column separators at the beginning and end of lines
-        # Also remove the last trailing line
-        regex = rf"[\s{re.escape(col_separator)}]+"
-        new_data = "\n".join(
-            re.sub(f"{regex}$", "", re.sub(f"^{regex}", "", line))
-            for line in new_data.split(rec_separator)
-        ).rstrip()
-
         return pl.read_csv(
-            new_data.encode(),
+            tokenize_data(data_s, col_separator, rec_separator),
             separator=col_separator,
             new_columns=column_names,
             has_header=False,
-            columns=list(range(0, len(column_names))),
+            columns=(list(range(0, len(column_names))) if columns is None else columns),
         )
 
 
+def read_header(f: IO | mmap.mmap) -> str | bytes:
+    """
+    Read a gef file up to and including the #EOH line, the data block is not read.
+
+    The header is read from the current position of the stream, the position is
+    restored afterwards such that the stream can still be read completely.
+
+    Parameters
+    ----------
+    f: IO
+        The *.gef file opened in text or binary mode, or the memory mapped file.
+
+    Returns
+    -------
+    header: str | bytes
+        The header of the gef file.
+    """
+    position = f.tell()
+    lines = []
+    try:
+        while line := f.readline():
+            lines.append(line)
+            # the lines are either bytes or str
+            if line[:4] in (b"#EOH", "#EOH"):
+                break
+    finally:
+        f.seek(position)
+    return lines[0][:0].join(lines) if lines else ""
+
+
+def split_header(buffer: bytes | mmap.mmap) -> Tuple[str, bytes]:
+    """
+    Split a gef file in the decoded header and the raw data block.
+
+    Parameters
+    ----------
+    buffer: bytes | mmap.mmap
+        Bytes version of the *.gef file or the memory mapped *.gef file.
+
+    Returns
+    -------
+    header, data: Tuple[str, bytes]
+        The header up to and including the #EOH line and the data block. The data
+        block of a memory mapped file is copied out of the map, as it is parsed
+        after the map is closed by the lazy readers.
+    """
+    match = _END_OF_HEADER.search(buffer)
+    if match is None:
+        return str(buffer, "utf-8", errors="ignore"), b""
+    return (
+        str(buffer[: match.start(1)], "utf-8", errors="ignore"),
+        buffer[match.end() :],
+    )
+
+
+def tokenize_data(data_s: str | bytes, col_separator: str, rec_separator: str) -> bytes:
+    """
+    Normalize the data block of a gef file into a buffer that can be read by
+    `pl.read_csv` with `col_separator` as separator and a newline as end of line.
+
+    The data is tokenized in a single pass over the records: whitespace around the
+    column separators, leading and trailing whitespace and column separators of a
+    record, and empty records are removed. Whitespace column separators may be
+    repeated.
+
+    Parameters
+    ----------
+    data_s: str | bytes
+        The measurement data, in Delimiter-separated format.
+    col_separator: str
+        The character that separates the columns
+    rec_separator: str
+        The character that separates the records/rows
+
+    Returns
+    -------
+    buffer: bytes
+        The normalized data, one record per line
+    """
+    if isinstance(data_s, str):
+        return _tokenize(data_s, col_separator, rec_separator).encode()
+    return _tokenize(data_s, col_separator.encode(), rec_separator.encode())
+
+
+def _tokenize(data, col_separator, rec_separator):
+    """Implementation of `tokenize_data` for either str or bytes"""
+    if isinstance(data, str):
+        whitespace, horizontal_whitespace = string.whitespace, _HORIZONTAL_WHITESPACE
+        new_line = "\n"
+    else:
+        whitespace = string.whitespace.encode()
+        horizontal_whitespace = _HORIZONTAL_WHITESPACE.encode()
+        new_line = b"\n"
+
+    records = data.split(rec_separator)
+
+    if col_separator.isspace():
+        rows = (col_separator.join(record.split()) for record in records)
+    else:
+        strip_chars = whitespace + col_separator
+        rows = (
+            col_separator.join(
+                map(
+                    type(data).strip,
+                    record.strip(strip_chars).split(col_separator),
+                    repeat(horizontal_whitespace),
+                )
+            )
+            for record in records
+        )
+
+    return new_line.join(filter(None, rows))
+
+
+def count_column_voids(
+    df: pl.DataFrame, col_name_to_void_mapping: Dict[str, float]
+) -> Dict[str, int]:
+    """
+    Count the void values of every column in a single pass over the data.
+
+    :param df: DataFrame with the data
+    :param col_name_to_void_mapping: mapping of the column names to the void values
+    :return: mapping of the column names to the number of void values
+    """
+    counts = [
+        (pl.col(col) == pl.lit(void)).sum().alias(col)
+        for col, void in col_name_to_void_mapping.items()
+        if col in df.columns
+    ]
+    if not counts:
+        return {}
+    return df.select(counts).row(0, named=True)
+
+
 def replace_column_void(
-    lf: pl.LazyFrame, col_name_to_void_mapping: Dict[str, float]
+    lf: pl.LazyFrame,
+    col_name_to_void_mapping: Dict[str, float],
+    columns: List[str] | None = None,
 ) -> pl.LazyFrame:
+    """
+    Replace the void values by the interpolated values.
+
+    :param lf: LazyFrame with the data
+    :param col_name_to_void_mapping: mapping of the column names to the void values
+    :param columns: only these columns contain void or null values and are
+        replaced, the other columns are left as is. None replaces all columns.
+    :return: LazyFrame
+    """
     return (
         # Get all values matching column_void and change them to null
         # Interpolate all null values
         lf.select(
             [
-                pl.when(pl.col(col) == pl.lit(col_name_to_void_mapping[col]))
-                .then(None)
-                .otherwise(pl.col(col))
-                .interpolate()
-                .name.keep()
+                (
+                    pl.when(pl.col(col) == pl.lit(col_name_to_void_mapping[col]))
+                    .then(None)
+                    .otherwise(pl.col(col))
+                    .interpolate()
+                    .name.keep()
+                    if columns is None or col in columns
+                    else pl.col(col)
+                )
                 for col in lf.collect_schema().names()
             ]
         )
     )
 
 
+def columns_with_voids(df: pl.DataFrame, void_count: Dict[str, int]) -> List[str]:
+    """
+    Get the columns that contain void or null values.
+
+    :param df: DataFrame with the data
+    :param void_count: mapping of the column names to the number of void values
+    :return: the column names
+    """
+    return [col for col in df.columns if void_count.get(col) or df[col].null_count()]
+
+
 def parse_all_columns_info_from_dict(
     headers: dict, quantity_dict: dict
 ) -> List[Tuple[int, str, str, int]]:
@@ -202,7 +202,7 @@ class _MappingParameters:
             "WA": "Formatie van Waalre ",
         }
 
-    @lru_cache(1)
+    @lru_cache(maxsize=None)
     def dino_to_bro(self, s: str) -> str:
         # TODO update soil_code from NEN 5104 -> NEN-EN-ISO 14688-1:2019+NEN 8990:2020
         main = s[0]
@@ -3,12 +3,25 @@ from __future__ import annotations
 import polars as pl
 
 from pygef.gef import utils
-from pygef.gef.gef import _Gef, parse_all_columns_info, replace_column_void
+from pygef.gef.gef import (
+    _Gef,
+    columns_with_voids,
+    count_column_voids,
+    parse_all_columns_info,
+    replace_column_void,
+)
 from pygef.gef.mapping import MAP_QUANTITY_NUMBER_COLUMN_NAME_BORE
 
 
 class _GefBore(_Gef):
-    def __init__(self, path=None, string=None):
+    def __init__(
+        self,
+        path=None,
+        string=None,
+        header_only=False,
+        soil_code_mapping=None,
+        remarks_as_list=False,
+    ):
         """
         Parser of the borehole file.
 
@@ -16,8 +29,17 @@ class _GefBore(_Gef):
         ----------
         path: str
             Path to the *.gef file.
-        string: str
-            String version of the *.gef file.
+        string: str | bytes | mmap.mmap
+            String or bytes version of the *.gef file, or the memory mapped file.
+        header_only: bool
+            If True only the headers are parsed and `df` is an empty DataFrame with
+            the columns of the measurement data.
+        soil_code_mapping: dict
+            Mapping of soil codes to soil names that extends or overrides the
+            default mapping of the soil codes.
+        remarks_as_list: bool
+            If True the remarks are a list of the decoded additional informations
+            instead of a numbered string.
         """
         super().__init__(path=path, string=string)
         if self.type == "bore":
@@ -45,22 +67,43 @@ class _GefBore(_Gef):
             column_voids=utils.parse_column_void(self._headers),
         )
 
-        data_s_rows = self._data.split(self.data_info.rec_separator)
+        if header_only:
+            self.df = pl.DataFrame(
+                schema={
+                    **dict.fromkeys(self.data_info.descriptions, pl.Float64),
+                    "geotechnicalSoilCode": pl.String,
+                    "remarks": pl.List(pl.String) if remarks_as_list else pl.String,
+                    "geotechnicalSoilName": pl.String,
+                }
+            )
+            return
+
+        # the soil information is text, so the data block is decoded here
+        data_s = self._data
+        if isinstance(data_s, bytes):
+            data_s = data_s.decode("utf-8", errors="ignore")
+
+        data_s_rows = data_s.split(self.data_info.rec_separator)
         data_rows_soil = self.extract_soil_info(
             data_s_rows, self.data_info.columns_number, self.data_info.col_separator
         )
 
+        df = self.parse_data(
+            data_s,
+            self.data_info.col_separator,
+            self.data_info.rec_separator,
+            self.data_info.descriptions,
+        )
+        void_mapping = self.data_info.description_to_void_mapping
         self.df = (
-            self.parse_data(
-                self._data,
-                self.data_info.col_separator,
-                self.data_info.rec_separator,
-                self.data_info.descriptions,
+            df.pipe(
+                replace_column_void,
+                void_mapping,
+                columns_with_voids(df, count_column_voids(df, void_mapping)),
             )
-            .pipe(replace_column_void, self.data_info.description_to_void_mapping)
             .pipe(self.parse_data_soil_code, data_rows_soil)
-            .pipe(self.parse_add_info_as_string, data_rows_soil)
-            .pipe(self.map_soil_code_to_soil_name, data_rows_soil)
+            .pipe(self.parse_add_info_as_string, data_rows_soil, remarks_as_list)
+            .pipe(self.map_soil_code_to_soil_name, soil_code_mapping)
         )
 
         # Remove the rows with null values
@@ -68,12 +111,12 @@ class _GefBore(_Gef):
 
     @staticmethod
     def parse_add_info_as_string(
-        df: pl.DataFrame, data_rows_soil: list[list[str]]
+        df: pl.DataFrame, data_rows_soil: list[list[str]], as_list: bool = False
     ) -> pl.DataFrame:
         return df.with_columns(
-            pl.Series(
-                "remarks",
-                [utils.parse_add_info("".join(row[1::])) for row in data_rows_soil],
+            utils.parse_add_info_series(
+                pl.Series("remarks", ["".join(row[1::]) for row in data_rows_soil]),
+                as_list=as_list,
             )
         )
 
@@ -87,25 +130,20 @@ class _GefBore(_Gef):
 
     @staticmethod
     def parse_data_soil_code(df: pl.DataFrame, data_rows_soil: list[list[str]]):
-        # return df.with_columns(pl.Series("soil_code", data_rows_soil).apply(utils.parse_soil_code))
         return df.with_columns(
             pl.Series(
                 "geotechnicalSoilCode",
-                list(map(lambda x: utils.parse_soil_code(x[0]), data_rows_soil)),
-            )
+                [row[0] for row in data_rows_soil],
+                dtype=pl.String,
+            ).str.replace_all("'", "", literal=True)
         )
 
     @staticmethod
-    def map_soil_code_to_soil_name(df: pl.DataFrame, data_rows_soil: list[str]):
-        # return df.with_columns(pl.Series("soil_code", data_rows_soil).apply(utils.parse_soil_code))
+    def map_soil_code_to_soil_name(
+        df: pl.DataFrame, soil_code_mapping: dict[str, str] | None = None
+    ):
         return df.with_columns(
-            pl.Series(
-                "geotechnicalSoilName",
-                list(
-                    map(
-                        lambda x: utils.parse_soil_name(utils.parse_soil_code(x[0])),
-                        data_rows_soil,
-                    )
-                ),
+            utils.parse_soil_names(df["geotechnicalSoilCode"], soil_code_mapping).alias(
+                "geotechnicalSoilName"
             )
         )
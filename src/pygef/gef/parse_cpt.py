@@ -1,12 +1,26 @@
 from __future__ import annotations
 
-from typing import List
+from functools import cached_property
+from typing import Dict, List
 
 import numpy as np
 import polars as pl
 
+from pygef.common import (
+    deferred_frame,
+    depth_range_bounds,
+    filter_depth_offset_range,
+    filter_depth_range,
+)
+from pygef.cpt import select_columns
 from pygef.gef import utils
-from pygef.gef.gef import _Gef, parse_all_columns_info, replace_column_void
+from pygef.gef.gef import (
+    _Gef,
+    columns_with_voids,
+    count_column_voids,
+    parse_all_columns_info,
+    replace_column_void,
+)
 from pygef.gef.mapping import MAP_QUANTITY_NUMBER_COLUMN_NAME_CPT
 
 
@@ -17,6 +31,11 @@ class _GefCpt(_Gef):
         string=None,
         replace_column_voids=True,
         remove_pre_excavated_rows=True,
+        header_only=False,
+        columns=None,
+        depth_range=None,
+        depth_reference="penetrationLength",
+        lazy=False,
     ):
         """
         Parser of the cpt file.
@@ -25,13 +44,28 @@ class _GefCpt(_Gef):
         ----------
         path: str
             Path to the *.gef file.
-        string: str
-            String version of the *.gef file.
+        string: str | bytes | mmap.mmap
+            String or bytes version of the *.gef file, or the memory mapped file.
         :param replace_column_voids: boolean, default True.
             If True (default) column voids will be replaced either by interpolated
             value, or by Null value. If False, then column void data is left unchanged.
         :param remove_pre_excavated_rows: boolean, default True.
             How to handle pre-excavated row values. If true, drop rows above pre-excavated depth; else retain.
+        :param header_only: boolean, default False.
+            If True only the headers are parsed and `df` is an empty DataFrame with
+            the columns of the measurement data.
+        :param columns: list of column names, default None.
+            Only parse these columns of the measurement data, the columns required
+            for the post-processing are always parsed. None parses all columns.
+        :param depth_range: tuple of floats (top, bottom), default None.
+            Only keep the rows within this depth window. None keeps all rows.
+        :param depth_reference: str, default "penetrationLength".
+            Reference of the depth window, either "penetrationLength", "depth"
+            or "depthOffset".
+        :param lazy: boolean, default False.
+            If True the measurement data is only parsed when the plan in `lazy_df`
+            is collected. The columns are parsed as floats and the column voids
+            are not counted, `column_void_count` is None.
         """
         super().__init__(path=path, string=string)
         if not self.type == "cpt":
@@ -142,16 +176,73 @@ class _GefCpt(_Gef):
             column_voids=utils.parse_column_void(self._headers),
         )
 
-        lazy_df = self.parse_data(
-            self._data,
-            self.columns_info.col_separator,
-            self.columns_info.rec_separator,
-            self.columns_info.descriptions,
-        ).lazy()
+        if columns is not None and "depth" not in self.columns_info.descriptions:
+            # the depth is computed from the inclination if it is not measured
+            columns = [*columns, "inclinationResultant"]
+        selection = select_columns(self.columns_info.descriptions, columns)
+        column_names = [self.columns_info.descriptions[i] for i in selection]
+
+        self.column_void_count = None
+        if header_only:
+            if "depth" not in column_names and "inclinationResultant" in column_names:
+                column_names = column_names + ["depth"]
+            self.lazy_df = pl.LazyFrame(schema=dict.fromkeys(column_names, pl.Float64))
+            return
+
+        void_mapping = self.columns_info.description_to_void_mapping
+
+        def parse_measurements() -> pl.DataFrame:
+            # the measurements are floats, such that the schema of the data does
+            # not depend on the values and is known before the data is parsed
+            return self.parse_data(
+                self._data,
+                self.columns_info.col_separator,
+                self.columns_info.rec_separator,
+                column_names,
+                selection,
+            ).cast(pl.Float64)
+
+        if lazy:
+            df = None
+            lazy_df = deferred_frame(
+                parse_measurements, dict.fromkeys(column_names, pl.Float64)
+            )
+        else:
+            df = parse_measurements()
+            self.column_void_count = count_column_voids(df, void_mapping)
+            lazy_df = df.lazy()
+
+        if depth_range is not None:
+            column, lower, upper = depth_range_bounds(
+                depth_range, depth_reference, self.zid
+            )
+            if column == "depth" and not (
+                "depth" in column_names or "inclinationResultant" in column_names
+            ):
+                # without a depth the penetration length is used, as in `depthOffset`
+                column = "penetrationLength"
+            if column in column_names:
+                lazy_df = lazy_df.pipe(
+                    select_depth_range_rows,
+                    column,
+                    lower,
+                    upper,
+                    void_mapping,
+                    # a depth computed from the inclination depends on all rows above
+                    keep_rows_above="depth" not in column_names
+                    and "inclinationResultant" in column_names,
+                )
 
         if replace_column_voids:
+            # only the columns with voids are replaced, unknown before parsing
             lazy_df = lazy_df.pipe(
-                replace_column_void, self.columns_info.description_to_void_mapping
+                replace_column_void,
+                void_mapping,
+                (
+                    None
+                    if df is None
+                    else columns_with_voids(df, self.column_void_count)
+                ),
             )
 
         pipeline = (
@@ -167,10 +258,63 @@ class _GefCpt(_Gef):
                 correct_pre_excavated_depth, self.pre_excavated_depth
             )
 
-        pipeline = pipeline.pipe(
-            correct_depth_with_inclination, self.columns_info.descriptions
-        )
-        self.df = pipeline.collect()
+        pipeline = pipeline.pipe(correct_depth_with_inclination, column_names)
+        if depth_range is not None and depth_reference == "depthOffset":
+            pipeline = pipeline.pipe(
+                filter_depth_offset_range, column, depth_range, self.zid
+            )
+        elif depth_range is not None:
+            pipeline = pipeline.pipe(filter_depth_range, column, lower, upper)
+        # the plan is collected on access of `df`, or by `CPTData` together with
+        # the post-processing of the CPTData
+        self.lazy_df = pipeline
+
+    @cached_property
+    def df(self) -> pl.DataFrame:
+        """The parsed data"""
+        return self.lazy_df.collect()
+
+
+def select_depth_range_rows(
+    lf: pl.LazyFrame,
+    column: str,
+    lower: float,
+    upper: float,
+    col_name_to_void_mapping: Dict[str, float],
+    keep_rows_above: bool = False,
+) -> pl.LazyFrame:
+    """
+    Select the rows within the depth window before the column voids are replaced.
+
+    The selection is extended to the nearest rows without voids above and below the
+    window, such that the interpolation of the voids at the edges of the window
+    gives the same result as the interpolation over all rows. If `keep_rows_above`
+    is True only the rows below the window are dropped.
+    """
+    names = lf.collect_schema().names()
+    index = pl.int_range(pl.len())
+    reference = (
+        pl.when(pl.col(column) == pl.lit(col_name_to_void_mapping[column]))
+        .then(None)
+        .otherwise(pl.col(column))
+        .interpolate()
+        .abs()
+    )
+    in_window = reference.is_between(lower, upper)
+    valid = pl.all_horizontal(
+        pl.col(col).is_not_null() & (pl.col(col) != pl.lit(void))
+        for col, void in col_name_to_void_mapping.items()
+        if col in names
+    )
+    first = index.filter(in_window).min()
+    last = index.filter(in_window).max()
+    start = (
+        pl.lit(0)
+        if keep_rows_above
+        else index.filter(valid & (index < first)).max().fill_null(0)
+    )
+    end = index.filter(valid & (index > last)).min().fill_null(pl.len())
+    return lf.filter(first.is_not_null() & index.is_between(start, end))
 
 
 def correct_pre_excavated_depth(lf: pl.LazyFrame, pre_excavated_depth) -> pl.LazyFrame:
@@ -3,15 +3,110 @@ from __future__ import annotations
 import logging
 import re
 from datetime import date
-from typing import Dict, List, Tuple, Union
+from typing import Any, Dict, List, Tuple, Union
 
-import numpy as np
+import polars as pl
 
 from pygef import exceptions
 from pygef.gef.mapping import MAPPING_PARAMETERS
 
 logger = logging.getLogger(__name__)
 
+# precompiled patterns of the parsers of the string headers
+PATTERNS: Dict[str, re.Pattern] = {
+    # the header lines of the fields parsed by `parse_header_fields`
+    # not anchored to the line start, like the patterns of the fields
+    "HEADER_LINE": re.compile(
+        r"(#(ZID|XYID|FILEDATE|TESTID|REPORTCODE|PROCEDURECODE|PROJECTID|"
+        r"MEASUREMENTTEXT|COLUMNINFO|COLUMNSEPARATOR|RECORDSEPARATOR|COLUMNVOID)"
+        r"\b[^\n]*)"
+    ),
+    "COLUMNVOID": re.compile(r"#COLUMNVOID\s*=\s*(.*)"),
+    "COLUMNVOID_VALUE": re.compile(r"^(\d+)\s*,\s*([-+]?\d+\.?\d*)"),
+    "MEASUREMENTVAR": re.compile(r"#MEASUREMENTVAR[=\s+]+(\d+)[, ]+([\d-]+\.?\d*)"),
+    "CONE_ID": re.compile(r"#MEASUREMENTTEXT[=\s+]+4[, ]+([\w.-]+)"),
+    "CPT_CLASS": re.compile(r"#MEASUREMENTTEXT[=\s+]+6[, ](.*)"),
+    "CLASS": re.compile(r"^.*?(klasse|class|kl.).*?(\d{1})"),
+    "PROJECTID_CPT": re.compile(r"PROJECTID[\s=a-zA-Z,]*([\w-]+)"),
+    "PROJECTID_BORE": re.compile(r"#PROJECTID+[^a-zA-Z]+([\w-]+)"),
+    "ZID": re.compile(r"#ZID[=\s+]+[^,]*[,\s+]+([^?!,$|\s$]+)"),
+    "HEIGHT_SYSTEM": re.compile(r"#ZID[=\s+]+([^,]*)"),
+    "XYID": re.compile(r"#XYID[=\s+]*.*?,\s*(\d*\s*(\.|\d)*),\s*(\d*(\.|\d)*)"),
+    "COORDINATE_CODE": re.compile(
+        r"#XYID[=\s+](\d*.*?),\s*(\d*\s*(\.|\d)*),\s*(\d*(\.|\d)*)"
+    ),
+    "GEF_TYPE": re.compile(r"#(REPORTCODE|PROCEDURECODE)[^a-zA-Z]+([\w-]+)"),
+    "FILEDATE": re.compile(r"#FILEDATE[\s=]*(\d+)[,\s+]+(\d+)[,\s+]+(\d+)"),
+    "COLUMNINFO": re.compile(r"#COLUMNINFO[=\s]+(\d+)"),
+    "COLUMNSEPARATOR": re.compile(r"#COLUMNSEPARATOR+[=\s+]+(.)"),
+    "RECORDSEPARATOR": re.compile(r"#RECORDSEPARATOR+[=\s+]+(.)"),
+    "TESTID": re.compile(r"#TESTID+[=\s+]+(.*)"),
+}
+
+
+class HeaderIndex(dict):
+    """
+    Headers of a gef file as returned by `gef_to_map`, with keyed access to the
+    numbered header lines, e.g. `#MEASUREMENTVAR= 13, 1.0, m, ...`.
+
+    The index of a header name is built on the first lookup and reused by all
+    following lookups. The headers should not be modified after a lookup.
+
+    The keyed lookups of `measurement_header_value`,
+    `parse_measurement_var_as_float` and `parse_column_void` use the index. The
+    other parsers either read the first line of a header, which is a plain dict
+    lookup, or need every line in the order of the file, e.g. the #COLUMNINFO
+    lines of `parse_all_columns_info`, which an index can not speed up.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._first_by_key: Dict[str, Dict[str, List[str]]] = {}
+        self._last_by_number: Dict[str, Dict[int, List[str]]] = {}
+
+    def first_by_key(self, name: str) -> Dict[str, List[str]]:
+        """
+        Map the first value of the header lines to the line, the first line wins
+        on duplicate keys.
+
+        :param name:(str) Header name.
+        :return: (Dict[str, List[str]]) Header lines by key.
+        """
+        index = self._first_by_key.get(name)
+        if index is None:
+            index = {}
+            for values in self.get(name, ()):
+                index.setdefault(values[0], values)
+            self._first_by_key[name] = index
+        return index
+
+    def last_by_number(self, name: str) -> Dict[int, List[str]]:
+        """
+        Map the number of the header lines to the line, the last line wins on
+        duplicate numbers.
+
+        :param name:(str) Header name.
+        :return: (Dict[int, List[str]]) Header lines by number.
+        """
+        index = self._last_by_number.get(name)
+        if index is None:
+            index = {int(values[0]): values for values in self.get(name, ())}
+            self._last_by_number[name] = index
+        return index
+
+
+def header_index(headers: dict) -> HeaderIndex:
+    """
+    Get the header index of the headers, the index is only built if the headers
+    are not indexed yet.
+
+    :param headers:(Dict) Dictionary of headers.
+    :return: (HeaderIndex) Indexed headers.
+    """
+    if isinstance(headers, HeaderIndex):
+        return headers
+    return HeaderIndex(headers)
+
 
 def cast_string(f, s):
     """
@@ -40,7 +135,7 @@ def measurement_header_value(headers, name, index=0, cast=None, key=0):
     :return: (str) The header value.
     """
     if name in headers:
-        mapping = {int(value[0]): value for value in headers[name]}
+        mapping = header_index(headers).last_by_number(name)
 
         if key in mapping:
             result = mapping[key][index]
@@ -75,7 +170,7 @@ def parse_regex_cast(regex_string, s, f, group_number):
     """
     Function that searches a regex match and casts the result.
 
-    :param regex_string: (str) Regex pattern.
+    :param regex_string: (Union[str, re.Pattern]) Regex pattern or compiled pattern.
     :param s: (str) String to search for regex pattern.
     :param f: (function) To apply to the regex match.
     :param group_number: (int) Which group number to query when there is a match.
@@ -104,20 +199,25 @@ def parse_column_void(headers: Union[dict, str]) -> Dict[int, float]:
         # Return a list of all the second float values of all COLUMN_VOID lines
         if "COLUMNVOID" in headers:
             try:
-                voids_info = list(
-                    map(
-                        lambda values: (int(values[0]), float(values[1])),
-                        headers["COLUMNVOID"],
-                    )
-                )
+                voids_by_number = header_index(headers).last_by_number("COLUMNVOID")
+                column_void = {
+                    number: float(values[1])
+                    for number, values in voids_by_number.items()
+                }
             except ValueError:
                 raise exceptions.ParseGefError(
                     ": One of more #COLUMNVOID headers have an invalid format."
                 )
+            # the index keeps a single line per column number
+            if len(column_void) < len(headers["COLUMNVOID"]):
+                raise exceptions.ParseGefError(
+                    ": One or more #COLUMNVOID headers have duplicate definitions."
+                )
+            return column_void
 
     else:
-        for void_line in re.finditer(r"#COLUMNVOID\s*=\s*(.*)", headers):
-            voids = re.search(r"^(\d+)\s*,\s*([-+]?\d+\.?\d*)", void_line.group(1))
+        for void_line in PATTERNS["COLUMNVOID"].finditer(headers):
+            voids = PATTERNS["COLUMNVOID_VALUE"].search(void_line.group(1))
 
             if not voids:
                 raise exceptions.ParseGefError(
@@ -127,7 +227,7 @@ def parse_column_void(headers: Union[dict, str]) -> Dict[int, float]:
             voids_info.append((int(voids.group(1)), float(voids.group(2))))
 
     col_numbers = list(map(lambda values: values[0], voids_info))
-    if any(np.unique(col_numbers, return_counts=True)[1] > 1):
+    if len(set(col_numbers)) < len(col_numbers):
         raise exceptions.ParseGefError(
             ": One or more #COLUMNVOID headers have duplicate definitions."
         )
@@ -150,16 +250,14 @@ def parse_measurement_var_as_float(headers, var_number):
 
     try:
         if isinstance(headers, dict):
-            # Loop over all headers to find the right number
-            if "MEASUREMENTVAR" in headers:
-                for values in headers["MEASUREMENTVAR"]:
-                    if values[0] == var_number_str:
-                        return float(values[1])
+            values = (
+                header_index(headers).first_by_key("MEASUREMENTVAR").get(var_number_str)
+            )
+            if values is not None:
+                return float(values[1])
         else:
             # Find all '#MEASUREMENTVAR= **,' strings first
-            for match in re.finditer(
-                r"#MEASUREMENTVAR[=\s+]+(\d+)[, ]+([\d-]+\.?\d*)", headers
-            ):
+            for match in PATTERNS["MEASUREMENTVAR"].finditer(headers):
                 # The first group is the variable number
                 if match.group(1) == var_number_str:
                     # The second group is the actual value
@@ -180,9 +278,7 @@ def parse_cone_id(headers):
         return measurement_header_value(headers, "MEASUREMENTTEXT", index=1, key=4)
     else:
         try:
-            return parse_regex_cast(
-                r"#MEASUREMENTTEXT[=\s+]+4[, ]+([\w.-]+)", headers, str, 1
-            )
+            return parse_regex_cast(PATTERNS["CONE_ID"], headers, str, 1)
         except ValueError:
             return None
 
@@ -200,13 +296,9 @@ def parse_cpt_class(headers) -> int | None:
             headers, "MEASUREMENTTEXT", key=6, index=1
         )
     else:
-        all_definition = parse_regex_cast(
-            r"#MEASUREMENTTEXT[=\s+]+6[, ](.*)", headers, str, 1
-        )
+        all_definition = parse_regex_cast(PATTERNS["CPT_CLASS"], headers, str, 1)
     if all_definition is not None:
-        return parse_regex_cast(
-            r"^.*?(klasse|class|kl.).*?(\d{1})", all_definition.lower(), int, 2
-        )
+        return parse_regex_cast(PATTERNS["CLASS"], all_definition.lower(), int, 2)
     return None
 
 
@@ -230,9 +322,9 @@ def parse_project_type(headers, gef_type):
             return first_header_value(headers, "PROJECTID")
     else:
         if gef_type == "cpt":
-            return parse_regex_cast(r"PROJECTID[\s=a-zA-Z,]*([\w-]+)", headers, str, 1)
+            return parse_regex_cast(PATTERNS["PROJECTID_CPT"], headers, str, 1)
         elif gef_type == "bore":
-            return parse_regex_cast(r"#PROJECTID+[^a-zA-Z]+([\w-]+)", headers, str, 1)
+            return parse_regex_cast(PATTERNS["PROJECTID_BORE"], headers, str, 1)
 
 
 def parse_zid_as_float(headers):
@@ -246,9 +338,7 @@ def parse_zid_as_float(headers):
         if "ZID" in headers:
             return first_header_value(headers, "ZID", index=1, cast=float)
     else:
-        return parse_regex_cast(
-            r"#ZID[=\s+]+[^,]*[,\s+]+([^?!,$|\s$]+)", headers, float, 1
-        )
+        return parse_regex_cast(PATTERNS["ZID"], headers, float, 1)
 
 
 def parse_height_system(headers):
@@ -261,7 +351,7 @@ def parse_height_system(headers):
     if isinstance(headers, dict):
         return first_header_value(headers, "ZID", cast=float)
     else:
-        return parse_regex_cast(r"#ZID[=\s+]+([^,]*)", headers, float, 1)
+        return parse_regex_cast(PATTERNS["HEIGHT_SYSTEM"], headers, float, 1)
 
 
 def parse_xid_as_float(headers):
@@ -274,9 +364,7 @@ def parse_xid_as_float(headers):
     if isinstance(headers, dict):
         return first_header_value(headers, "XYID", index=1, cast=float)
     else:
-        return parse_regex_cast(
-            r"#XYID[=\s+]*.*?,\s*(\d*\s*(\.|\d)*),\s*(\d*(\.|\d)*)", headers, float, 1
-        )
+        return parse_regex_cast(PATTERNS["XYID"], headers, float, 1)
 
 
 def parse_yid_as_float(headers):
@@ -289,9 +377,7 @@ def parse_yid_as_float(headers):
     if isinstance(headers, dict):
         return first_header_value(headers, "XYID", index=2, cast=float)
     else:
-        return parse_regex_cast(
-            r"#XYID[=\s+]*.*?,\s*(\d*\s*(\.|\d)*),\s*(\d*(\.|\d)*)", headers, float, 3
-        )
+        return parse_regex_cast(PATTERNS["XYID"], headers, float, 3)
 
 
 def parse_coordinate_code(headers):
@@ -304,12 +390,11 @@ def parse_coordinate_code(headers):
     if isinstance(headers, dict):
         return first_header_value(headers, "XYID", index=0)
     else:
-        return parse_regex_cast(
-            r"#XYID[=\s+](\d*.*?),\s*(\d*\s*(\.|\d)*),\s*(\d*(\.|\d)*)",
-            headers,
-            lambda x: x.lower(),
-            1,
-        ).strip()
+        code = parse_regex_cast(
+            PATTERNS["COORDINATE_CODE"], headers, lambda x: x.lower(), 1
+        )
+        if code is not None:
+            return code.strip()
 
 
 def parse_gef_type(headers):
@@ -328,21 +413,16 @@ def parse_gef_type(headers):
         else:
             return None
     else:
-        if parse_regex_cast(
-            r"#PROCEDURECODE[^a-zA-Z]+([\w-]+)", headers, lambda x: x.lower(), 1
-        ) and parse_regex_cast(
-            r"#REPORTCODE[^a-zA-Z]+([\w-]+)", headers, lambda x: x.lower(), 1
-        ):
-            proc_code = parse_regex_cast(
-                r"#REPORTCODE[^a-zA-Z]+([\w-]+)", headers, lambda x: x.lower(), 1
-            )
+        # the first code of each kind, the report code wins if both are present
+        codes: Dict[str, str] = {}
+        for match in PATTERNS["GEF_TYPE"].finditer(headers):
+            codes.setdefault(match.group(1), match.group(2).lower())
+        if not codes:
+            return None
+        elif len(codes) == 2:
+            proc_code = codes["REPORTCODE"]
         else:
-            proc_code = parse_regex_cast(
-                r"#(REPORTCODE|PROCEDURECODE)[^a-zA-Z]+([\w-]+)",
-                headers,
-                lambda x: x.lower(),
-                2,
-            )
+            proc_code = next(iter(codes.values()))
 
     if "cpt" in proc_code or "dis" in proc_code:
         return "cpt"
@@ -371,7 +451,7 @@ def parse_file_date(headers):
         else:
             return None
     else:
-        g = re.search(r"#FILEDATE[\s=]*(\d+)[,\s+]+(\d+)[,\s+]+(\d+)", headers)
+        g = PATTERNS["FILEDATE"].search(headers)
         if g:
             year = int(g.group(1))
             month = int(g.group(2))
@@ -394,7 +474,7 @@ def parse_columns_number(headers: Union[dict, str]) -> int:
             return len(headers["COLUMNINFO"])
 
     else:
-        col_numbers = re.findall(r"#COLUMNINFO[=\s]+(\d+)", headers)
+        col_numbers = PATTERNS["COLUMNINFO"].findall(headers)
         if col_numbers:
             return len(col_numbers)
 
@@ -432,7 +512,7 @@ def parse_column_separator(headers):
     if isinstance(headers, dict):
         return first_header_value(headers, "COLUMNSEPARATOR")
     else:
-        return parse_regex_cast(r"#COLUMNSEPARATOR+[=\s+]+(.)", headers, str, 1)
+        return parse_regex_cast(PATTERNS["COLUMNSEPARATOR"], headers, str, 1)
 
 
 def parse_test_id(headers):
@@ -446,7 +526,7 @@ def parse_test_id(headers):
     if isinstance(headers, dict):
         result = first_header_value(headers, "TESTID")
     else:
-        result = parse_regex_cast(r"#TESTID+[=\s+]+(.*)", headers, str, 1)
+        result = parse_regex_cast(PATTERNS["TESTID"], headers, str, 1)
 
     if result is not None:
         return result.strip()
@@ -462,7 +542,7 @@ def parse_record_separator(headers):
     if isinstance(headers, dict):
         return first_header_value(headers, "RECORDSEPARATOR")
     else:
-        return parse_regex_cast(r"#RECORDSEPARATOR+[=\s+]+(.)", headers, str, 1)
+        return parse_regex_cast(PATTERNS["RECORDSEPARATOR"], headers, str, 1)
 
 
 def get_column_separator(headers: Union[dict, str]) -> str:
@@ -481,6 +561,56 @@ def get_record_separator(headers: Union[dict, str]) -> str:
     return parse_record_separator(headers) or "\n"
 
 
+def scan_header_lines(headers: str) -> Dict[str, str]:
+    """
+    Function that groups the header lines of the fields parsed by
+    `parse_header_fields` by header name in a single pass over the headers, such
+    that a parser only has to search the lines of its header.
+
+    :param headers:(str) String of headers.
+    :return: (Dict[str, str]) The header lines joined by newlines per header name.
+    """
+    lines: Dict[str, List[str]] = {}
+    for line, name in PATTERNS["HEADER_LINE"].findall(headers):
+        lines.setdefault(name, []).append(line)
+    return {name: "\n".join(values) for name, values in lines.items()}
+
+
+def parse_header_fields(headers: str) -> Dict[str, Any]:
+    """
+    Function that parses the common fields of a string of headers with a single
+    scan over the headers.
+
+    :param headers:(str) String of headers.
+    :return: (Dict[str, Any]) The parsed fields, None if the field is missing.
+    """
+    lines = scan_header_lines(headers)
+    gef_type = parse_gef_type(
+        "\n".join([lines.get("REPORTCODE", ""), lines.get("PROCEDURECODE", "")])
+    )
+    return {
+        "zid": parse_zid_as_float(lines.get("ZID", "")),
+        "height_system": parse_height_system(lines.get("ZID", "")),
+        "x": parse_xid_as_float(lines.get("XYID", "")),
+        "y": parse_yid_as_float(lines.get("XYID", "")),
+        "coordinate_system": parse_coordinate_code(lines.get("XYID", "")),
+        "file_date": parse_file_date(lines.get("FILEDATE", "")),
+        "test_id": parse_test_id(lines.get("TESTID", "")),
+        "type": gef_type,
+        "project_id": (
+            parse_project_type(lines.get("PROJECTID", ""), gef_type)
+            if gef_type in ("cpt", "bore")
+            else None
+        ),
+        "cone_id": parse_cone_id(lines.get("MEASUREMENTTEXT", "")),
+        "cpt_class": parse_cpt_class(lines.get("MEASUREMENTTEXT", "")),
+        "columns_number": parse_columns_number(lines.get("COLUMNINFO", "")),
+        "column_separator": parse_column_separator(lines.get("COLUMNSEPARATOR", "")),
+        "record_separator": parse_record_separator(lines.get("RECORDSEPARATOR", "")),
+        "column_void": parse_column_void(lines.get("COLUMNVOID", "")),
+    }
+
+
 def parse_soil_code(s: str) -> str:
     """
     Function to parse the soil code.
@@ -503,6 +633,103 @@ def parse_soil_name(s: str) -> str:
     return MAPPING_PARAMETERS.dino_to_bro(s)
 
 
+def parse_soil_names(
+    soil_codes: pl.Series, soil_code_mapping: Dict[str, str] | None = None
+) -> pl.Series:
+    """
+    Function to parse the soil names of a column of soil codes. Every unique soil
+    code is mapped once, the column is translated with a lookup table.
+
+    NOTE: interpretation of the soil code to NEN-EN-ISO 14688-1:2019+NEN 8990:2020
+
+    :param soil_codes: (pl.Series) Series with the soil codes.
+    :param soil_code_mapping: (Optional[Dict[str, str]]) Mapping of soil codes to
+        soil names that extends or overrides the default mapping.
+    :return: (pl.Series) Series with the soil names.
+    """
+    if soil_code_mapping is None:
+        soil_code_mapping = {}
+    table = {
+        code: (
+            soil_code_mapping[code]
+            if code in soil_code_mapping
+            else parse_soil_name(code)
+        )
+        for code in soil_codes.unique().drop_nulls()
+        if code
+    }
+    return soil_codes.replace_strict(
+        table, default="niet gedefinieerd", return_dtype=pl.String
+    )
+
+
+def parse_add_info_series(add_info: pl.Series, as_list: bool = False) -> pl.Series:
+    """
+    Function to parse the additional informations of a column, the vectorized
+    version of `parse_add_info`.
+
+    :param add_info: (pl.Series) Series with the quoted additional informations.
+    :param as_list: (bool) If True return the decoded additional informations of a
+        row as a list instead of a numbered string.
+    :return: (pl.Series) Series with the additional informations.
+    """
+    table = MAPPING_PARAMETERS.code_to_text()
+    text = pl.col("add_info")
+    segment_count = pl.col("segment").list.len()
+    segments = (
+        pl.DataFrame({"add_info": add_info}, schema={"add_info": pl.String})
+        .with_row_index("row")
+        .lazy()
+        # strip the outer quotes and split the quoted informations
+        .select(
+            "row",
+            text.str.slice(1, (text.str.len_chars() - 2).clip(0))
+            .str.split("''")
+            .alias("segment"),
+        )
+        # number the informations per row by the offset of the first information
+        .with_columns(offset=segment_count.cum_sum() - segment_count)
+        .explode("segment")
+        .with_columns(number=pl.int_range(1, pl.len() + 1) - pl.col("offset"))
+        .filter(pl.col("segment") != "")
+        .with_row_index("segment_index")
+        # translate the codes of the informations
+        .with_columns(token=pl.col("segment").str.split(" "))
+        .explode("token")
+        .with_columns(
+            pl.col("token").replace_strict(
+                table, default=pl.col("token") + " ", return_dtype=pl.String
+            )
+        )
+        # aggregating to lists and joining those is cheaper than a string aggregation
+        .group_by("segment_index", maintain_order=True)
+        .agg(pl.col("row", "number").first(), "token")
+        .select("row", "number", pl.col("token").list.join(""))
+    )
+    if as_list:
+        result = segments.group_by("row", maintain_order=True).agg(
+            pl.col("token").str.strip_chars_end().alias("add_info")
+        )
+        empty = pl.lit([], dtype=pl.List(pl.String))
+    else:
+        result = segments.group_by("row", maintain_order=True).agg(
+            pl.format("{}) {}", "number", "token").alias("add_info")
+        )
+        result = result.with_columns(pl.col("add_info").list.join(""))
+        empty = pl.lit("")
+
+    return (
+        pl.LazyFrame({"row": pl.int_range(len(add_info), dtype=pl.UInt32, eager=True)})
+        .join(result, on="row", how="left")
+        # the order of a join is not guaranteed, the rows are sorted by number
+        .sort("row")
+        .select(pl.col("add_info").fill_null(empty))
+        .collect()
+        .to_series()
+        .rename(add_info.name)
+    )
+
+
 def parse_add_info(headers):
     """
     Function to parse all the additional informations.
@@ -1,73 +1,129 @@
 from __future__ import annotations
 
 import io
+import mmap
+import multiprocessing
 import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Callable, Iterable, Iterator, Literal, TypeGuard, TypeVar
 
 from pygef.bore import BoreData
+from pygef.broxml.parse_bore import iter_bore
 from pygef.broxml.parse_bore import read_bore as read_bore_xml
+from pygef.broxml.parse_cpt import iter_cpt
 from pygef.broxml.parse_cpt import read_cpt as read_cpt_xml
-from pygef.common import Location, VerticalDatumClass, convert_coordinate_system_to_gml
+from pygef.broxml.xml_parser import count_payloads as count_xml_payloads
+from pygef.common import (
+    Location,
+    VerticalDatumClass,
+    convert_coordinate_system_to_gml,
+    map_file,
+)
 from pygef.cpt import CPTData
+from pygef.exceptions import ReadError
+from pygef.gef.gef import read_header
 from pygef.gef.parse_bore import _GefBore
 from pygef.gef.parse_cpt import _GefCpt
 
 GEF_ID = "#GEFID"
 
+T = TypeVar("T", CPTData, BoreData)
+R = TypeVar("R")
 
-def is_gef_file(file: io.BytesIO | Path | str) -> bool:
+
+def is_gef_file(file: io.BytesIO | Path | str | mmap.mmap) -> bool:
     """
     gef files start with '#GEFID' so we check the content
     of the file
     """
+    if isinstance(file, mmap.mmap):
+        return file[:6].decode(errors="ignore").startswith(GEF_ID)
     if isinstance(file, io.BytesIO):
         pos = file.tell()
         is_gef = file.read(6).decode().startswith(GEF_ID)
         file.seek(pos)
         return is_gef
     if os.path.exists(file):
-        with open(file, errors="ignore") as f:
-            return f.read(6).startswith(GEF_ID)
+        with open(file, "rb") as f:
+            return f.read(6).decode(errors="ignore").startswith(GEF_ID)
     if isinstance(file, str):
         return file[:6].startswith(GEF_ID)
     raise FileNotFoundError("Could not find the GEF file.")
 
 
 def read_bore(
-    file: io.BytesIO | Path | str,
+    file: io.BytesIO | Path | str | mmap.mmap,
     index: int = 0,
     engine: Literal["auto", "gef", "xml"] = "auto",
+    memory_map: bool = False,
+    soil_code_mapping: dict[str, str] | None = None,
+    remarks_as_list: bool = False,
+    huge_tree: bool = False,
 ) -> BoreData:
     """
-    Parse the bore file. Can either be BytesIO, Path or str
+    Parse the bore file. Can either be BytesIO, Path, str or a memory mapped file
 
     :param file: bore file
     :param index: only valid for xml files
     :param engine: default is "auto". parsing engine.
         Please note that auto engine checks if the files starts with `#GEFID`.
+    :param memory_map: default False. If true and the file is a path, the file is
+        memory mapped and parsed from the mapped buffer instead of read into memory.
+        The data block of a gef file is copied out of the buffer once.
+    :param soil_code_mapping: default None. Only valid for gef files. Mapping of
+        soil codes to soil names, e.g. `{"Zs1": "zand"}`, that extends or overrides
+        the default mapping of the soil codes.
+    :param remarks_as_list: default False. Only valid for gef files. If true the
+        remarks column is a list of the decoded additional informations of a layer
+        instead of a numbered string.
+    :param huge_tree: default False. Only valid for xml files. If true the security
+        restrictions of the xml parser on the depth of the tree and the size of the
+        text nodes are disabled, e.g. for very large measurement data. Only use it
+        for trusted files.
     """
+    if memory_map and _is_path(file):
+        with map_file(file) as buffer:
+            return read_bore(
+                buffer,
+                index=index,
+                engine=engine,
+                soil_code_mapping=soil_code_mapping,
+                remarks_as_list=remarks_as_list,
+                huge_tree=huge_tree,
+            )
+
     if engine == "gef" or is_gef_file(file) and engine == "auto":
         if index > 0:
             raise ValueError("an index > 0 not supported for GEF files")
-        if isinstance(file, io.BytesIO):
-            return gef_bore_to_bore_data(_GefBore(string=file.read().decode()))
-        if os.path.exists(file):
-            return gef_bore_to_bore_data(_GefBore(path=file))
-        else:
-            return gef_bore_to_bore_data(_GefBore(string=file))
-    return read_bore_xml(file)[index]
+        return gef_bore_to_bore_data(
+            _GefBore(
+                **_gef_source(file),
+                soil_code_mapping=soil_code_mapping,
+                remarks_as_list=remarks_as_list,
+            )
+        )
+    return read_bore_xml(file, index=index, huge_tree=huge_tree)[0]
 
 
 def read_cpt(
-    file: io.BytesIO | Path | str,
+    file: io.BytesIO | Path | str | mmap.mmap,
     index: int = 0,
     engine: Literal["auto", "gef", "xml"] = "auto",
     replace_column_voids: bool = True,
     remove_pre_excavated_rows: bool = True,
+    memory_map: bool = False,
+    columns: list[str] | None = None,
+    depth_range: tuple[float, float] | None = None,
+    depth_reference: str = "penetrationLength",
+    lazy: bool = False,
+    huge_tree: bool = False,
 ) -> CPTData:
     """
-    Parse the cpt file. Can either be BytesIO, Path or str
+    Parse the cpt file. Can either be BytesIO, Path, str or a memory mapped file
 
     :param file: bore file
     :param index: only valid for xml files
@@ -77,36 +133,414 @@ def read_cpt(
         If true, replace void values with nulls or interpolate; else retain value.
     :param remove_pre_excavated_rows: default True. How to handle pre-excavated row values.
         If true, drop rows above pre-excavated depth; else retain.
+    :param memory_map: default False. If true and the file is a path, the file is
+        memory mapped and parsed from the mapped buffer instead of read into memory.
+        The data block of a gef file is copied out of the buffer once.
+    :param columns: default None. Only parse these columns of the measurement data,
+        e.g. `["penetrationLength", "coneResistance", "localFriction"]`. Columns
+        required for the post-processing (penetrationLength, coneResistance,
+        depth or inclinationResultant) are always parsed. Columns that are
+        not in the file are ignored. If None, all columns are parsed.
+    :param depth_range: default None. Only keep the rows within this (top, bottom)
+        window, e.g. `(10.0, 15.0)`. The rows outside the window are dropped before
+        the post-processing. If None, all rows are kept.
+    :param depth_reference: default "penetrationLength". Reference of the
+        depth_range, either "penetrationLength", "depth" (corrected for the
+        inclination) or "depthOffset" (with respect to the vertical datum, e.g.
+        NAP). Falls back to the penetrationLength if the depth is not available.
+    :param lazy: default False. If true only the headers are parsed, the measurement
+        data is parsed on the first access of `CPTData.data`. Use
+        `CPTData.lazy_data` to extend the plan without parsing the data. The
+        column voids are not counted, `CPTData.column_void_count` is None.
+    :param huge_tree: default False. Only valid for xml files. If true the security
+        restrictions of the xml parser on the depth of the tree and the size of the
+        text nodes are disabled, e.g. for very large measurement data. Only use it
+        for trusted files.
     """
+    if memory_map and _is_path(file):
+        with map_file(file) as buffer:
+            return read_cpt(
+                buffer,
+                index=index,
+                engine=engine,
+                replace_column_voids=replace_column_voids,
+                remove_pre_excavated_rows=remove_pre_excavated_rows,
+                columns=columns,
+                depth_range=depth_range,
+                depth_reference=depth_reference,
+                lazy=lazy,
+                huge_tree=huge_tree,
+            )
 
     if engine == "gef" or is_gef_file(file) and engine == "auto":
         if index > 0:
             raise ValueError("an index > 0 not supported for GEF files")
-        if isinstance(file, io.BytesIO):
-            return gef_cpt_to_cpt_data(
-                _GefCpt(
-                    string=file.read().decode(),
-                    replace_column_voids=replace_column_voids,
-                    remove_pre_excavated_rows=remove_pre_excavated_rows,
-                )
-            )
-        if os.path.exists(file):
-            return gef_cpt_to_cpt_data(
-                _GefCpt(
-                    path=file,
-                    replace_column_voids=replace_column_voids,
-                    remove_pre_excavated_rows=remove_pre_excavated_rows,
-                )
-            )
-        else:
-            return gef_cpt_to_cpt_data(
-                _GefCpt(
-                    string=file,
-                    replace_column_voids=replace_column_voids,
-                    remove_pre_excavated_rows=remove_pre_excavated_rows,
-                )
-            )
-    return read_cpt_xml(file)[index]
+        gef_cpt = _GefCpt(
+            **_gef_source(file),
+            replace_column_voids=replace_column_voids,
+            remove_pre_excavated_rows=remove_pre_excavated_rows,
+            columns=columns,
+            depth_range=depth_range,
+            depth_reference=depth_reference,
+            lazy=lazy,
+        )
+        return gef_cpt_to_cpt_data(gef_cpt, lazy=lazy)
+    return read_cpt_xml(
+        file,
+        columns=columns,
+        depth_range=depth_range,
+        depth_reference=depth_reference,
+        lazy=lazy,
+        index=index,
+        huge_tree=huge_tree,
+    )[0]
+
+
+def iter_cpt_xml(
+    file: io.BytesIO | Path | str | mmap.mmap,
+    columns: list[str] | None = None,
+    depth_range: tuple[float, float] | None = None,
+    depth_reference: str = "penetrationLength",
+    lazy: bool = False,
+    huge_tree: bool = False,
+    fields: list[str] | None = None,
+) -> Iterator[CPTData]:
+    """
+    Iterate over the cpts of a BRO xml file. Can either be BytesIO, Path, str or a
+    memory mapped file
+
+    The file is parsed incrementally, every dispatch document is resolved into a
+    CPTData and released before the next one is parsed. The memory usage does not
+    grow with the number of cpts in the file.
+
+    :param file: cpt xml file
+    :param columns: default None. Only parse these columns of the measurement data,
+        see `read_cpt`.
+    :param depth_range: default None. Only keep the rows within this (top, bottom)
+        window, see `read_cpt`.
+    :param depth_reference: default "penetrationLength". Reference of the
+        depth_range, see `read_cpt`.
+    :param lazy: default False. Defer the parsing of the measurement data until the
+        first access of `CPTData.data`, see `read_cpt`.
+    :param huge_tree: default False. Disable the security restrictions of the xml
+        parser, see `read_cpt`.
+    :param fields: default None. Only resolve these attributes of the CPTData,
+        e.g. `["bro_id", "delivered_location"]`, the other attributes are None.
+        The measurement data is only parsed if "data" is one of the fields, its
+        depthOffset column requires "delivered_vertical_position_offset".
+        If None, all attributes are resolved.
+    """
+    return iter_cpt(
+        file,
+        columns=columns,
+        depth_range=depth_range,
+        depth_reference=depth_reference,
+        lazy=lazy,
+        huge_tree=huge_tree,
+        fields=fields,
+    )
+
+
+def iter_bore_xml(
+    file: io.BytesIO | Path | str | mmap.mmap,
+    huge_tree: bool = False,
+    fields: list[str] | None = None,
+) -> Iterator[BoreData]:
+    """
+    Iterate over the bores of a BRO xml file. Can either be BytesIO, Path, str or a
+    memory mapped file
+
+    The file is parsed incrementally, every dispatch document is resolved into a
+    BoreData and released before the next one is parsed. The memory usage does not
+    grow with the number of bores in the file.
+
+    :param file: bore xml file
+    :param huge_tree: default False. Disable the security restrictions of the xml
+        parser, see `read_bore`.
+    :param fields: default None. Only resolve these attributes of the BoreData,
+        the other attributes are None. The layers are only parsed if "data" is one
+        of the fields. If None, all attributes are resolved.
+    """
+    return iter_bore(file, huge_tree=huge_tree, fields=fields)
+
+
+def count_payloads(
+    file: io.BytesIO | Path | str | mmap.mmap, huge_tree: bool = False
+) -> int:
+    """
+    Count the cpts or bores in a BRO xml file without parsing them. Can either be
+    BytesIO, Path, str or a memory mapped file
+
+    Use it to read the file one cpt or bore at a time with the `index` of
+    `read_cpt` or `read_bore`, only the payload at the index is parsed.
+
+    :param file: xml file
+    :param huge_tree: default False. Disable the security restrictions of the xml
+        parser, see `read_cpt`.
+    """
+    return count_xml_payloads(file, huge_tree=huge_tree)
+
+
+def read_cpts(
+    sources: Iterable[io.BytesIO | Path | str],
+    workers: int | None = None,
+    chunksize: int = 1,
+    ordered: bool = True,
+    on_error: Literal["raise", "return"] = "raise",
+    **kwargs: Any,
+) -> Iterator[CPTData | ReadError]:
+    """
+    Parse a batch of cpt files in a pool of processes. The files can either be
+    BytesIO, Path or str.
+
+    The CPTData are yielded as soon as they are parsed. By default an error of a
+    file is raised when its CPTData would be yielded, which stops the batch.
+
+    The processes are spawned, every process imports the main module of the
+    program. A script that calls this function must do so under an
+    `if __name__ == "__main__":` guard, otherwise the script is run again by
+    every process.
+
+    :param sources: the cpt files
+    :param workers: default None. Number of processes, None uses a process per
+        cpu. With a single worker the files are parsed in the current process.
+    :param chunksize: default 1. Number of files that are sent to a process at once,
+        a larger chunksize reduces the overhead of many small files.
+    :param ordered: default True. If true the CPTData are yielded in the order of
+        the sources, else in the order in which they are parsed.
+    :param on_error: default "raise". If "return" the error of a file is yielded
+        as a `pygef.exceptions.ReadError` in place of its CPTData, with the source
+        and the message of the error, and the other files are still parsed.
+    :param kwargs: keyword arguments of `read_cpt`, e.g. `columns`. The data is
+        always parsed eagerly, `lazy` is not supported.
+    """
+    if kwargs.get("lazy"):
+        raise ValueError("lazy is not supported, the data is sent between processes")
+    return _read_batch(
+        partial(read_cpt, **kwargs), sources, workers, chunksize, ordered, on_error
+    )
+
+
+def read_bores(
+    sources: Iterable[io.BytesIO | Path | str],
+    workers: int | None = None,
+    chunksize: int = 1,
+    ordered: bool = True,
+    on_error: Literal["raise", "return"] = "raise",
+    **kwargs: Any,
+) -> Iterator[BoreData | ReadError]:
+    """
+    Parse a batch of bore files in a pool of processes. The files can either be
+    BytesIO, Path or str.
+
+    The BoreData are yielded as soon as they are parsed. By default an error of a
+    file is raised when its BoreData would be yielded, which stops the batch.
+
+    The processes are spawned, every process imports the main module of the
+    program. A script that calls this function must do so under an
+    `if __name__ == "__main__":` guard, otherwise the script is run again by
+    every process.
+
+    :param sources: the bore files
+    :param workers: default None. Number of processes, None uses a process per
+        cpu. With a single worker the files are parsed in the current process.
+    :param chunksize: default 1. Number of files that are sent to a process at once,
+        a larger chunksize reduces the overhead of many small files.
+    :param ordered: default True. If true the BoreData are yielded in the order of
+        the sources, else in the order in which they are parsed.
+    :param on_error: default "raise". If "return" the error of a file is yielded
+        as a `pygef.exceptions.ReadError` in place of its BoreData, with the source
+        and the message of the error, and the other files are still parsed.
+    :param kwargs: keyword arguments of `read_bore`, e.g. `soil_code_mapping`.
+    """
+    return _read_batch(
+        partial(read_bore, **kwargs), sources, workers, chunksize, ordered, on_error
+    )
+
+
+def _read_batch(
+    reader: Callable[..., T],
+    sources: Iterable[io.BytesIO | Path | str],
+    workers: int | None,
+    chunksize: int,
+    ordered: bool,
+    on_error: Literal["raise", "return"] = "raise",
+) -> Iterator[T | ReadError]:
+    """Parse the sources with the reader in a pool of processes"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    if on_error not in ("raise", "return"):
+        raise ValueError(f"on_error should be 'raise' or 'return', got '{on_error}'")
+    read: Callable[..., T | ReadError] = (
+        reader if on_error == "raise" else partial(_return_error, reader)
+    )
+    if workers == 1:
+        return map(read, sources)
+    return _read_in_pool(read, sources, workers, chunksize, ordered)
+
+
+def _return_error(
+    reader: Callable[..., T], source: io.BytesIO | Path | str
+) -> T | ReadError:
+    """Read the source, an error is returned as a `ReadError`"""
+    try:
+        return reader(source)
+    except Exception as e:
+        return ReadError(source, f"{type(e).__name__}: {e}")
+
+
+def _read_in_pool(
+    reader: Callable[..., R],
+    sources: Iterable[io.BytesIO | Path | str],
+    workers: int,
+    chunksize: int,
+    ordered: bool,
+) -> Iterator[R]:
+    # polars is not fork-safe, the processes are spawned
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    chunks = _chunks(sources, chunksize)
+    # a bounded window of chunks is submitted, the next chunk of the sources is
+    # only taken once a chunk is done, such that the sources are streamed
+    pending: deque[Future[list[R]]] = deque(
+        executor.submit(_read_chunk, reader, chunk)
+        for chunk in islice(chunks, 2 * workers)
+    )
+    try:
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = next(future for future in pending if future in done)
+                pending.remove(future)
+            parsed = future.result()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(executor.submit(_read_chunk, reader, chunk))
+            yield from parsed
+    finally:
+        # the files that are not parsed yet are cancelled if the iteration stops
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _chunks(
+    sources: Iterable[io.BytesIO | Path | str], size: int
+) -> Iterator[list[io.BytesIO | Path | str]]:
+    """Take the sources in lists of the size, the last list can be shorter"""
+    iterator = iter(sources)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _read_chunk(
+    reader: Callable[..., R], sources: list[io.BytesIO | Path | str]
+) -> list[R]:
+    return [reader(source) for source in sources]
+
+
+def read_bore_header(
+    file: io.BytesIO | Path | str | mmap.mmap,
+    index: int = 0,
+    engine: Literal["auto", "gef", "xml"] = "auto",
+    memory_map: bool = False,
+) -> BoreData:
+    """
+    Parse only the header of the bore file. Can either be BytesIO, Path, str or a
+    memory mapped file
+
+    The data of the returned BoreData is an empty DataFrame with the columns of
+    the bore data. GEF files are read up to the #EOH line, the data block is
+    never read.
+
+    :param file: bore file
+    :param index: only valid for xml files
+    :param engine: default is "auto". parsing engine.
+        Please note that auto engine checks if the files starts with `#GEFID`.
+    :param memory_map: default False. If true and the file is a path, the file is
+        memory mapped and the header is parsed from the mapped buffer, only the
+        pages of the header of a gef file are read.
+    """
+    if memory_map and _is_path(file):
+        with map_file(file) as buffer:
+            return read_bore_header(buffer, index=index, engine=engine)
+
+    if engine == "gef" or is_gef_file(file) and engine == "auto":
+        if index > 0:
+            raise ValueError("an index > 0 not supported for GEF files")
+        return gef_bore_to_bore_data(
+            _GefBore(string=_read_gef_header(file), header_only=True)
+        )
+    return read_bore_xml(file, header_only=True, index=index)[0]
+
+
+def read_cpt_header(
+    file: io.BytesIO | Path | str | mmap.mmap,
+    index: int = 0,
+    engine: Literal["auto", "gef", "xml"] = "auto",
+    memory_map: bool = False,
+) -> CPTData:
+    """
+    Parse only the header of the cpt file. Can either be BytesIO, Path, str or a
+    memory mapped file
+
+    The data of the returned CPTData is an empty DataFrame with the columns of
+    the cpt data. GEF files are read up to the #EOH line, the data block is
+    never read.
+
+    :param file: cpt file
+    :param index: only valid for xml files
+    :param engine: default is "auto". parsing engine.
+        Please note that auto engine checks if the files starts with `#GEFID`.
+    :param memory_map: default False. If true and the file is a path, the file is
+        memory mapped and the header is parsed from the mapped buffer, only the
+        pages of the header of a gef file are read.
+    """
+    if memory_map and _is_path(file):
+        with map_file(file) as buffer:
+            return read_cpt_header(buffer, index=index, engine=engine)
+
+    if engine == "gef" or is_gef_file(file) and engine == "auto":
+        if index > 0:
+            raise ValueError("an index > 0 not supported for GEF files")
+        return gef_cpt_to_cpt_data(
+            _GefCpt(string=_read_gef_header(file), header_only=True)
+        )
+    return read_cpt_xml(file, header_only=True, index=index)[0]
+
+
+def _read_gef_header(file: io.BytesIO | Path | str | mmap.mmap) -> str | bytes:
+    """Read the gef file up to and including the #EOH line"""
+    if isinstance(file, (io.BytesIO, mmap.mmap)):
+        return read_header(file)
+    if os.path.exists(file):
+        with open(file, "rb") as f:
+            return read_header(f)
+    if isinstance(file, str):
+        return read_header(io.StringIO(file))
+    raise FileNotFoundError("Could not find the GEF file.")
+
+
+def _gef_source(file: io.BytesIO | Path | str | mmap.mmap) -> dict[str, Any]:
+    """
+    Get the keyword argument of the source of the gef parsers, either the `path`
+    of the file or its content as `string`.
+    """
+    if isinstance(file, mmap.mmap):
+        return {"string": file}
+    if isinstance(file, io.BytesIO):
+        return {"string": file.read()}
+    if os.path.exists(file):
+        return {"path": file}
+    return {"string": file}
+
+
+def _is_path(file: io.BytesIO | Path | str | mmap.mmap) -> TypeGuard[Path | str]:
+    """Check if the file is a path to an existing file"""
+    return isinstance(file, (str, Path)) and os.path.exists(file)
 
 
 def convert_height_system_to_vertical_datum(height_system: float) -> str:
@@ -116,7 +550,7 @@ def convert_height_system_to_vertical_datum(height_system: float) -> str:
         return f"{int(height_system):05d}"
 
 
-def gef_cpt_to_cpt_data(gef_cpt: _GefCpt) -> CPTData:
+def gef_cpt_to_cpt_data(gef_cpt: _GefCpt, lazy: bool = False) -> CPTData:
     kwargs: dict[str, Any] = {}
 
     kwargs["delivered_location"] = Location(
@@ -128,8 +562,9 @@ def gef_cpt_to_cpt_data(gef_cpt: _GefCpt) -> CPTData:
     kwargs["standardized_location"] = None
     kwargs["bro_id"] = None
     kwargs["alias"] = gef_cpt.test_id
-    kwargs["data"] = gef_cpt.df
+    kwargs["data"] = gef_cpt.lazy_df
     kwargs["column_void_mapping"] = gef_cpt.columns_info.description_to_void_mapping
+    kwargs["column_void_count"] = gef_cpt.column_void_count
     kwargs["raw_headers"] = gef_cpt._headers
     kwargs["research_report_date"] = gef_cpt.file_date
     kwargs["cpt_standard"] = None
@@ -203,6 +638,8 @@ def gef_cpt_to_cpt_data(gef_cpt: _GefCpt) -> CPTData:
     # TODO! parse measurementtext 9 in gef?
     kwargs["delivered_vertical_position_reference_point"] = "unknown"
 
+    if lazy:
+        return CPTData.from_lazy(**kwargs)
     return CPTData(**kwargs)
 
 
@@ -1,8 +1,10 @@
 # flake8: noqa: E501 line too long (182 > 180 characters)
 from __future__ import annotations
 
+import mmap
 import os.path
 from datetime import datetime
+from io import BytesIO, StringIO
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -12,7 +14,15 @@ import pytest
 
 import pygef.gef.utils as utils
 from pygef import common, exceptions, plotting, read_bore, read_cpt
-from pygef.gef.gef import parse_all_columns_info, replace_column_void
+from pygef.gef.gef import (
+    columns_with_voids,
+    count_column_voids,
+    parse_all_columns_info,
+    read_header,
+    replace_column_void,
+    split_header,
+    tokenize_data,
+)
 from pygef.gef.mapping import MAP_QUANTITY_NUMBER_COLUMN_NAME_CPT
 from pygef.gef.parse_bore import _GefBore
 from pygef.gef.parse_cpt import _GefCpt, correct_pre_excavated_depth
@@ -137,6 +147,25 @@ def test_measurement_var_different_comma():
     np.testing.assert_almost_equal(v, 0.0)
 
 
+def test_header_index():
+    h = utils.HeaderIndex(
+        {
+            "MEASUREMENTVAR": [["41", "1", "deg", ""], ["41", "2", "deg", ""]],
+            "MEASUREMENTTEXT": [["4", "first"], ["4", "last"]],
+        }
+    )
+    assert h == {
+        "MEASUREMENTVAR": [["41", "1", "deg", ""], ["41", "2", "deg", ""]],
+        "MEASUREMENTTEXT": [["4", "first"], ["4", "last"]],
+    }
+    # the first measurement variable and the last measurement text wins
+    np.testing.assert_almost_equal(utils.parse_measurement_var_as_float(h, 41), 1)
+    assert utils.parse_cone_id(h) == "last"
+    assert utils.parse_measurement_var_as_float(h, 40) is None
+    assert h.first_by_key("COLUMNINFO") == {}
+    assert utils.header_index(h) is h
+
+
 def test_parse_cpt_class():
     s = r"#MEASUREMENTTEXT= 6, NEN 5140 / klasse onbekend, sondeernorm en kwaliteitsklasse"
     v = utils.parse_cpt_class(s)
@@ -344,6 +373,43 @@ def test_parse_gef_type():
     assert v == "cpt"
 
 
+def test_parse_gef_type_report_code_wins():
+    s = "#PROCEDURECODE= GEF-BORE-Report\n#REPORTCODE= GEF-CPT-Report"
+    assert utils.parse_gef_type(s) == "cpt"
+    assert utils.parse_gef_type("#TESTID= 4") is None
+
+
+def test_parse_header_fields():
+    s = "\n".join(
+        [
+            "#FILEDATE= 2004, 1, 14",
+            "#PROCEDURECODE= GEF-CPT-Report, 1, 0, 0, -",
+            "#TESTID= CPT-1 ",
+            "#XYID= 31000, 132127.181, 458102.351, 0.000, 0.000",
+            "#ZID= 31000, 1.3, 0.0",
+            "#MEASUREMENTTEXT= 4, C10CFIIP.1721, conus type en serienummer",
+            "#COLUMNINFO= 1, m, sondeertrajectlengte, 1",
+            "#COLUMNINFO= 2, MPa, conusweerstand, 2",
+            "#COLUMNVOID= 1, -9999.000000",
+            "#COLUMNSEPARATOR= ;",
+        ]
+    )
+    fields = utils.parse_header_fields(s)
+    assert fields["file_date"] == datetime(2004, 1, 14).date()
+    assert fields["type"] == "cpt"
+    assert fields["test_id"] == "CPT-1"
+    np.testing.assert_almost_equal(fields["x"], 132127.181)
+    np.testing.assert_almost_equal(fields["y"], 458102.351)
+    np.testing.assert_almost_equal(fields["zid"], 1.3)
+    assert fields["coordinate_system"] == "31000"
+    assert fields["cone_id"] == "C10CFIIP.1721"
+    assert fields["columns_number"] == 2
+    assert fields["column_void"] == {1: -9999.0}
+    assert fields["column_separator"] == ";"
+    assert fields["record_separator"] is None
+    assert fields["project_id"] is None
+
+
 def test_xyid():
     s = r"#XYID= 31000, 132127.181, 458102.351, 0.000, 0.000"
     x = utils.parse_xid_as_float(s)
@@ -497,6 +563,60 @@ def test_parse_data():
     assert df_parsed.equals(df, null_equal=True)
 
 
+def test_tokenize_data():
+    # custom separators with whitespace around the column separator
+    data_s = "\n00.00; -9999;  1.0;!\n00.01;0.013 ;0.2;!\n"
+    assert tokenize_data(data_s, ";", "!") == b"00.00;-9999;1.0\n00.01;0.013;0.2"
+
+    # repeated whitespace column separators and empty records
+    data_s = "\n\t1  2\t3 \n\n 4 5   6\n"
+    assert tokenize_data(data_s, " ", "\n") == b"1 2 3\n4 5 6"
+
+    # whitespace within a column is retained
+    data_s = "1;'TGR GE';!\n2;'ZMFO';!"
+    assert tokenize_data(data_s, ";", "!") == b"1;'TGR GE'\n2;'ZMFO'"
+
+    # bytes are tokenized without decoding
+    data_s = b"\n00.00; -9999;  1.0;!\n00.01;0.013 ;0.2;!\n"
+    assert tokenize_data(data_s, ";", "!") == b"00.00;-9999;1.0\n00.01;0.013;0.2"
+
+
+def test_split_header():
+    header, data = split_header(b"#GEFID= 1, 1, 0\r\n#EOH=\r\n\r\n 1 2\n 3 4\n")
+    assert header == "#GEFID= 1, 1, 0\r\n#EOH=\r"
+    assert data == b" 1 2\n 3 4\n"
+
+    header, data = split_header(b"#GEFID= 1, 1, 0\n#EOH=")
+    assert header == "#GEFID= 1, 1, 0\n#EOH="
+    assert data == b""
+
+
+def test_read_header():
+    content = b"#GEFID= 1, 1, 0\n#EOH=\n 1 2\n 3 4\n"
+    f = BytesIO(content)
+    assert read_header(f) == b"#GEFID= 1, 1, 0\n#EOH=\n"
+    # the position of the stream is restored
+    assert f.tell() == 0
+    assert f.read() == content
+
+    f = StringIO(content.decode())
+    f.seek(16)
+    assert read_header(f) == "#EOH=\n"
+    assert f.tell() == 16
+
+
+def test_read_header_memory_map(cpt_gef_1):
+    with open(cpt_gef_1, "rb") as f:
+        header = read_header(f)
+        assert f.tell() == 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            assert read_header(buffer) == header
+            assert buffer.tell() == 0
+            buffer.seek(6)
+            assert read_header(buffer) == header[6:]
+            assert buffer.tell() == 6
+
+
 def test_parse_column_separator():
     s = r"#COLUMNSEPARATOR = ;"
     v = utils.parse_column_separator(s)
@@ -589,6 +709,16 @@ def test_parse_column_void():
         header = "\n#COLUMNVOID=1,-999\n#COLUMNVOID=2,#COLUMNVOID=3,-999\n"
         utils.parse_column_void(header)
 
+    h = utils.HeaderIndex({"COLUMNVOID": [["1", "-999"], ["2", "-100.0"]]})
+    assert utils.parse_column_void(h) == {1: -999.0, 2: -100.0}
+    assert h.last_by_number("COLUMNVOID") == {1: ["1", "-999"], 2: ["2", "-100.0"]}
+
+    with pytest.raises(exceptions.ParseGefError, match="duplicate"):
+        utils.parse_column_void({"COLUMNVOID": [["1", "-999"], ["1", "-999"]]})
+
+    with pytest.raises(exceptions.ParseGefError, match="invalid format"):
+        utils.parse_column_void({"COLUMNVOID": [["1", "-999"], ["2", ""]]})
+
 
 def test_correct_pre_excavated_depth():
     df1 = pl.DataFrame(
@@ -634,6 +764,25 @@ def test_replace_column_void():
     assert df_calculated.equals(df, null_equal=True)
 
 
+def test_replace_column_void_only_columns_with_voids():
+    void_value = 999.0
+    column_void = {"penetrationLength": void_value, "coneResistance": void_value}
+    df1 = pl.DataFrame(
+        {
+            "penetrationLength": [0.0, 1.0, 2.0, 3.0, 4.0],
+            "coneResistance": [void_value, 0.5, None, 0.7, void_value],
+        }
+    )
+    void_count = count_column_voids(df1, column_void)
+    assert void_count == {"penetrationLength": 0, "coneResistance": 2}
+    columns = columns_with_voids(df1, void_count)
+    assert columns == ["coneResistance"]
+
+    df_calculated = replace_column_void(df1, column_void, columns)
+    assert df_calculated.equals(replace_column_void(df1, column_void))
+    assert df_calculated["coneResistance"].to_list() == [None, 0.5, 0.6, 0.7, None]
+
+
 def test_parse_cpt():
     cpt = read_cpt(
         """#GEFID= 1, 1, 0
@@ -736,6 +885,50 @@ def test_parse_cpt_with_replace_column_voids_enabled():
         )
 
 
+@pytest.mark.parametrize(
+    "depth_range, depth_reference",
+    [
+        ((0.02, 0.04), "penetrationLength"),
+        ((0.04, 0.02), "depth"),
+        ((-0.115, -0.125), "depthOffset"),
+    ],
+)
+def test_parse_cpt_with_depth_range(depth_range, depth_reference):
+    cpt = read_cpt(
+        os.path.join(BasePath, "../test_files/cpt_voids.gef"),
+        depth_range=depth_range,
+        depth_reference=depth_reference,
+    )
+    assert cpt.data.shape == (1, 4)
+    # the void is interpolated with the rows outside the window
+    assert cpt.data["penetrationLength"].round(4).to_list() == [0.03]
+    assert cpt.data["coneResistance"].round(4).to_list() == [1.253]
+
+    with pytest.raises(ValueError):
+        read_cpt(
+            os.path.join(BasePath, "../test_files/cpt_voids.gef"),
+            depth_range=depth_range,
+            depth_reference="elevation",
+        )
+
+
+@pytest.mark.parametrize("file", ["cpt.gef", "cpt4.gef", "cpt_pre_excavated.gef"])
+def test_parse_cpt_with_depth_offset_range_edges(file):
+    path = os.path.join(BasePath, "../test_files", file)
+    data = read_cpt(path).data
+    offsets = data["depthOffset"]
+    # the edges of the window are exactly on the depth offset of a row
+    windows = [(offsets[i], offsets[i]) for i in range(0, len(offsets), 97)]
+    windows += [
+        (offsets[0], offsets[-1]),
+        (offsets[len(offsets) // 4], offsets[-len(offsets) // 4]),
+    ]
+    for top, bottom in windows:
+        expected = data.filter(pl.col("depthOffset").is_between(bottom, top))
+        cpt = read_cpt(path, depth_range=(top, bottom), depth_reference="depthOffset")
+        assert cpt.data.equals(expected, null_equal=True)
+
+
 def test_parse_cpt_with_replace_column_voids_disabled():
     cpt = read_cpt(
         os.path.join(BasePath, "../test_files/cpt_voids.gef"),
@@ -989,6 +1182,68 @@ def test_bore_with_reduced_columns():
     )
 
 
+def test_bore_soil_code_mapping():
+    bore = read_bore(os.path.join(BasePath, "../test_files/example_bore.gef"))
+    assert bore.data["geotechnicalSoilCode"].head(3).to_list() == ["NBE", "NBE", "Zg1"]
+    assert bore.data["geotechnicalSoilName"].head(3).to_list() == [
+        "niet gedefinieerd",
+        "niet gedefinieerd",
+        "zand",
+    ]
+
+    bore = read_bore(
+        os.path.join(BasePath, "../test_files/example_bore.gef"),
+        soil_code_mapping={"NBE": "nietBepaald"},
+    )
+    assert bore.data["geotechnicalSoilName"].head(3).to_list() == [
+        "nietBepaald",
+        "nietBepaald",
+        "zand",
+    ]
+
+    codes = pl.Series(["Zs1", "", "Kz3", "Zs1"])
+    assert utils.parse_soil_names(codes).to_list() == [
+        "zwakZandigSilt",
+        "niet gedefinieerd",
+        "sterkZandigeKlei",
+        "zwakZandigSilt",
+    ]
+
+
+def test_parse_add_info_series():
+    add_info = ["'ZUF''DO TGR BR'", "", "'''DO BR'", "'Restante BZB.: PR (zwak)'"]
+    parsed = utils.parse_add_info_series(pl.Series("remarks", add_info))
+    assert parsed.name == "remarks"
+    assert parsed.to_list() == [utils.parse_add_info(s) for s in add_info]
+    assert parsed.to_list() == [
+        "1) uiterst fijn 2) dark gray-brown ",
+        "",
+        "2) dark brown ",
+        "1) Restante BZB.: PR (zwak) ",
+    ]
+
+    parsed = utils.parse_add_info_series(pl.Series(add_info), as_list=True)
+    assert parsed.to_list() == [
+        ["uiterst fijn", "dark gray-brown"],
+        [],
+        ["dark brown"],
+        ["Restante BZB.: PR (zwak)"],
+    ]
+
+
+def test_cpt_lazy_plan():
+    cpt = _GefCpt(path=os.path.join(BasePath, "../test_files/cpt.gef"))
+    assert isinstance(cpt.lazy_df, pl.LazyFrame)
+    assert cpt.df.equals(cpt.lazy_df.collect(), null_equal=True)
+
+    # the plan is collected by the CPTData together with the post-processing
+    data = read_cpt(os.path.join(BasePath, "../test_files/cpt.gef")).data
+    assert isinstance(data, pl.DataFrame)
+    assert data.drop("depthOffset", "frictionRatioComputed").equals(
+        cpt.df.sort("penetrationLength"), null_equal=True
+    )
+
+
 def test_pre_excavated_default_removes_rows_below_threshold():
     # Default behaviour should remove rows with depth < pre-excavated depth
     cpt = _GefCpt(
@@ -1,11 +1,23 @@
+import re
 from datetime import datetime
+from io import BytesIO
 
+import polars as pl
 import pytest
 from lxml.etree import XMLSyntaxError
 
-from pygef import read_cpt
+from pygef import (
+    read_bore,
+    read_bore_header,
+    read_bores,
+    read_cpt,
+    read_cpt_header,
+    read_cpts,
+)
+from pygef.bore import BoreData
 from pygef.common import Location, VerticalDatumClass
 from pygef.cpt import CPTData
+from pygef.exceptions import ReadError
 
 
 def test_engine(cpt_gef_1) -> None:
@@ -56,6 +68,18 @@ def test_gef_to_cpt_data(_type, cpt_gef_1, cpt_gef_1_bytes, cpt_gef_1_string) ->
             "penetrationLength": -9999.0,
             "porePressureU2": -999999.0,
         },
+        "column_void_count": {
+            "penetrationLength": 0,
+            "coneResistance": 1,
+            "correctedConeResistance": 1,
+            "localFriction": 5,
+            "frictionRatio": 5,
+            "porePressureU2": 1,
+            "inclinationResultant": 1,
+            "inclinationEW": 1,
+            "inclinationNS": 1,
+            "depth": 0,
+        },
         "delivered_vertical_position_datum": VerticalDatumClass("31000"),
         "delivered_vertical_position_offset": -0.09,
         "delivered_vertical_position_reference_point": "unknown",
@@ -185,3 +209,219 @@ def test_gef_to_cpt_data(_type, cpt_gef_1, cpt_gef_1_bytes, cpt_gef_1_string) ->
             "ZID": [["31000", "-0.09", "0.05"]],
         },
     }
+
+
+def test_memory_map(cpt_gef_1, cpt_xml, bore_xml_v2) -> None:
+    gef = read_cpt(cpt_gef_1)
+    gef_mapped = read_cpt(cpt_gef_1, memory_map=True)
+    assert gef_mapped.attributes() == gef.attributes()
+    assert gef_mapped.data.equals(gef.data, null_equal=True)
+
+    xml = read_cpt(cpt_xml)
+    xml_mapped = read_cpt(cpt_xml, memory_map=True)
+    assert xml_mapped.bro_id == xml.bro_id
+    assert xml_mapped.data.equals(xml.data, null_equal=True)
+
+    bore = read_bore(bore_xml_v2)
+    bore_mapped = read_bore(bore_xml_v2, memory_map=True)
+    assert bore_mapped.data.equals(bore.data, null_equal=True)
+
+
+def test_read_empty_file(tmp_path) -> None:
+    path = tmp_path / "empty.gef"
+    path.touch()
+    # an empty file fails as without the memory map
+    for memory_map in [False, True]:
+        with pytest.raises(XMLSyntaxError):
+            read_cpt(path, memory_map=memory_map)
+        with pytest.raises(ValueError, match="not a cpt"):
+            read_cpt(path, engine="gef", memory_map=memory_map)
+        with pytest.raises(XMLSyntaxError):
+            read_bore_header(path, memory_map=memory_map)
+
+
+@pytest.mark.parametrize("_type", ["string", "path", "byte"])
+def test_read_cpt_header(
+    _type, cpt_gef_1, cpt_gef_1_bytes, cpt_gef_1_string, cpt_xml
+) -> None:
+    _format = {
+        "string": cpt_gef_1_string,
+        "path": cpt_gef_1,
+        "byte": cpt_gef_1_bytes,
+    }
+    header = read_cpt_header(_format[_type]).attributes()
+    expected = read_cpt(cpt_gef_1).attributes()
+    assert header.pop("data") == (0, 12)
+    expected.pop("data")
+    # the data is not parsed, so the voids are not counted
+    assert header.pop("column_void_count") is None
+    expected.pop("column_void_count")
+    assert header == expected
+
+    cpt = read_cpt(cpt_xml)
+    header_xml = read_cpt_header(cpt_xml)
+    assert header_xml.bro_id == cpt.bro_id
+    assert header_xml.delivered_location == cpt.delivered_location
+    assert header_xml.data.is_empty()
+    assert header_xml.data.columns == cpt.data.columns
+
+
+def test_read_bore_header(bore_xml_v2) -> None:
+    bore = read_bore(bore_xml_v2)
+    header = read_bore_header(bore_xml_v2)
+    assert header.bro_id == bore.bro_id
+    assert header.final_bore_depth == bore.final_bore_depth
+    assert header.data.is_empty()
+    assert header.data.columns == bore.data.columns
+
+    header_mapped = read_bore_header(bore_xml_v2, memory_map=True)
+    assert header_mapped.bro_id == bore.bro_id
+    assert header_mapped.data.columns == bore.data.columns
+
+
+def test_read_cpt_header_memory_map(cpt_gef_1, cpt_xml) -> None:
+    for file in [cpt_gef_1, cpt_xml]:
+        header = read_cpt_header(file)
+        header_mapped = read_cpt_header(file, memory_map=True)
+        assert header_mapped.attributes() == header.attributes()
+
+
+def test_read_cpt_header_stream(cpt_gef_1_bytes) -> None:
+    header = read_cpt_header(cpt_gef_1_bytes)
+    # the stream is not consumed by reading the header
+    assert cpt_gef_1_bytes.tell() == 0
+    assert read_cpt_header(cpt_gef_1_bytes).attributes() == header.attributes()
+    assert read_cpt(cpt_gef_1_bytes).alias == header.alias
+
+
+def test_read_cpt_columns(cpt_gef_1, cpt_xml) -> None:
+    for file in [cpt_gef_1, cpt_xml]:
+        full = read_cpt(file)
+        projected = read_cpt(file, columns=["localFriction", "unknownColumn"])
+        assert "localFriction" in projected.data.columns
+        assert "inclinationResultant" not in projected.data.columns
+        assert {"penetrationLength", "coneResistance", "depth"}.issubset(
+            projected.data.columns
+        )
+        assert full.data.select(projected.data.columns).equals(
+            projected.data, null_equal=True
+        )
+
+
+def test_from_normalized(cpt_gef_1, bore_xml_v2) -> None:
+    cpt = read_cpt(cpt_gef_1)
+    kwargs = dict(cpt.__dict__)
+    cached = CPTData.from_normalized(**kwargs)
+    assert cached.data is cpt.data
+    assert cached.attributes() == cpt.attributes()
+
+    # the missing derived columns are computed and the data is sorted
+    kwargs["data"] = cpt.data.drop("depthOffset", "frictionRatioComputed").reverse()
+    cached = CPTData.from_normalized(**kwargs)
+    assert cached.data.select(cpt.data.columns).equals(cpt.data, null_equal=True)
+
+    bore = read_bore(bore_xml_v2)
+    kwargs = dict(bore.__dict__)
+    cached = BoreData.from_normalized(**kwargs)
+    assert cached.data is bore.data
+    assert cached.attributes() == bore.attributes()
+
+    kwargs["data"] = bore.data.drop("soilDistribution").reverse()
+    cached = BoreData.from_normalized(**kwargs)
+    assert cached.data.select(bore.data.columns).equals(bore.data, null_equal=True)
+
+    with pytest.raises(TypeError):
+        BoreData.from_normalized(data=bore.data)
+
+
+def test_read_cpt_lazy(cpt_gef_1, cpt_xml) -> None:
+    for file in [cpt_gef_1, cpt_xml]:
+        cpt = read_cpt(file)
+        lazy = read_cpt(file, lazy=True)
+        # the data is not parsed before the first access of `data`
+        assert lazy.columns == cpt.columns
+        assert lazy.attributes()["data"] is None
+        assert (
+            lazy.lazy_data.select("coneResistance")
+            .collect()
+            .equals(cpt.data.select("coneResistance"))
+        )
+        assert lazy.attributes()["data"] is None
+        assert lazy.data.equals(cpt.data, null_equal=True)
+        assert lazy.attributes()["data"] == cpt.data.shape
+        assert lazy.data is lazy.data
+        with pytest.raises(AttributeError, match="unknown_attribute"):
+            lazy.unknown_attribute
+
+
+def test_read_cpts(cpt_gef_1, cpt_gef_2, cpt_xml) -> None:
+    sources = [cpt_gef_1, cpt_xml, cpt_gef_2]
+    expected = [read_cpt(source) for source in sources]
+    for workers in [1, 2]:
+        parsed = list(read_cpts(sources, workers=workers, chunksize=2))
+        assert [cpt.attributes() for cpt in parsed] == [
+            cpt.attributes() for cpt in expected
+        ]
+    parsed = list(read_cpts(sources, workers=2, ordered=False))
+    assert sorted(cpt.data.height for cpt in parsed) == sorted(
+        cpt.data.height for cpt in expected
+    )
+
+    with pytest.raises(ValueError):
+        read_cpts(sources, lazy=True)
+
+
+def test_read_cpts_on_error(cpt_gef_1, cpt_xml) -> None:
+    invalid = BytesIO(b"<dispatchDataResponse>")
+    sources = [cpt_gef_1, invalid, cpt_xml]
+    for workers in [1, 2]:
+        parsed = list(read_cpts(sources, workers=workers, on_error="return"))
+        assert isinstance(parsed[0], CPTData) and isinstance(parsed[2], CPTData)
+        # the error of the invalid file is returned, the other files are parsed
+        assert isinstance(parsed[1], ReadError)
+        assert parsed[1].message.startswith("XMLSyntaxError")
+        assert "could not read" in str(parsed[1])
+
+    invalid.seek(0)
+    with pytest.raises(XMLSyntaxError):
+        list(read_cpts(sources, workers=1))
+    with pytest.raises(ValueError):
+        read_cpts(sources, on_error="ignore")
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_read_cpts_stream(cpt_gef_1, ordered) -> None:
+    taken = []
+
+    def sources():
+        for i in range(12):
+            taken.append(i)
+            yield cpt_gef_1
+
+    expected = read_cpt(cpt_gef_1)
+    parsed = read_cpts(sources(), workers=2, ordered=ordered)
+    assert next(parsed).attributes() == expected.attributes()
+    # only a window of two chunks per worker and the next chunk are taken
+    assert len(taken) == 5
+    assert len(list(parsed)) == 11
+    assert len(taken) == 12
+
+
+def test_read_bores(bore_xml_v2) -> None:
+    expected = read_bore(bore_xml_v2)
+    (bore,) = read_bores([bore_xml_v2], workers=1)
+    assert bore.attributes() == expected.attributes()
+
+
+def test_read_cpt_lazy_schema(cpt_gef_1) -> None:
+    cpt = read_cpt(cpt_gef_1)
+    assert cpt.data.schema == read_cpt(cpt_gef_1, lazy=True).data.schema
+
+    with open(cpt_gef_1, "rb") as f:
+        header, data = f.read().split(b"#EOH=")
+    # only integer measurements
+    integers = header + b"#EOH=" + re.sub(rb"(\d+)\.\d+", rb"\1", data)
+    eager = read_cpt(BytesIO(integers)).data
+    lazy = read_cpt(BytesIO(integers), lazy=True).data
+    assert eager["penetrationLength"].dtype == pl.Float64
+    assert eager.schema == lazy.schema
@@ -1,12 +1,16 @@
 from datetime import date
+from io import BytesIO
 
 import matplotlib.pyplot as plt
 import polars as pl
 import pytest
+from lxml import etree
 from polars.testing import assert_frame_equal
 
 from pygef import plotting
+from pygef.broxml import resolvers
 from pygef.broxml.mapping import MAPPING_PARAMETERS
+from pygef.broxml.parse_bore import iter_bore
 from pygef.broxml.parse_bore import read_bore as read_bore_xml
 from pygef.common import Location
 
@@ -206,3 +210,114 @@ def test_plot(bore_xml_v2) -> None:
     parsed = read_bore_xml(bore_xml_v2)
     axes = plotting.plot_bore(parsed[0])
     assert isinstance(axes, plt.Axes)
+
+
+def test_iter_bore(bore_xml_v2: str) -> None:
+    expected = read_bore_xml(bore_xml_v2)
+    parsed = list(iter_bore(bore_xml_v2))
+    assert len(parsed) == len(expected)
+    for bore, other in zip(parsed, expected):
+        assert bore.attributes() == other.attributes()
+        assert_frame_equal(bore.data, other.data)
+
+
+def test_process_bore_result() -> None:
+    ns = "http://www.broservices.nl/xsd/bhrgtcommon/2.1"
+    root = etree.fromstring(
+        f"""<log xmlns="urn:test" xmlns:bhrgtcom="{ns}">
+        <bhrgtcom:layer>
+            <bhrgtcom:upperBoundary>0.0</bhrgtcom:upperBoundary>
+            <bhrgtcom:lowerBoundary>1.0</bhrgtcom:lowerBoundary>
+            <bhrgtcom:soil>
+                <bhrgtcom:geotechnicalSoilName>zwak zandige klei</bhrgtcom:geotechnicalSoilName>
+                <bhrgtcom:colour>grijs-bruin</bhrgtcom:colour>
+                <bhrgtcom:dispersedInhomogeneity>nee</bhrgtcom:dispersedInhomogeneity>
+            </bhrgtcom:soil>
+        </bhrgtcom:layer>
+        <bhrgtcom:layer>
+            <bhrgtcom:upperBoundary>1.0</bhrgtcom:upperBoundary>
+            <bhrgtcom:lowerBoundary>2.5</bhrgtcom:lowerBoundary>
+            <bhrgtcom:soil>
+                <bhrgtcom:geotechnicalSoilName/>
+                <bhrgtcom:soilNameNEN5104>Zs1</bhrgtcom:soilNameNEN5104>
+                <bhrgtcom:colour/>
+                <bhrgtcom:dispersedInhomogeneity>ja</bhrgtcom:dispersedInhomogeneity>
+                <bhrgtcom:sandMedianClass>fijn</bhrgtcom:sandMedianClass>
+            </bhrgtcom:soil>
+        </bhrgtcom:layer>
+        <bhrgtcom:layer>
+            <bhrgtcom:upperBoundary>2.5</bhrgtcom:upperBoundary>
+            <bhrgtcom:lowerBoundary>3.0</bhrgtcom:lowerBoundary>
+        </bhrgtcom:layer>
+        </log>"""
+    )
+    df = resolvers.process_bore_result(root, namespaces=root.nsmap)
+    expected = pl.DataFrame(
+        {
+            "upperBoundary": [0.0, 1.0, 2.5],
+            "lowerBoundary": [1.0, 2.5, 3.0],
+            "geotechnicalSoilName": ["zwakzandigeklei", "Zs1", "niet gedefinieerd"],
+            "color": ["grijsbruin", "unknown", "onbekend"],
+            "dispersedInhomogeneity": [False, True, None],
+            "organicMatterContentClass": [None, None, None],
+            "sandMedianClass": [None, "fijn", None],
+        },
+        schema_overrides={"organicMatterContentClass": pl.String},
+    )
+    assert_frame_equal(df, expected)
+
+
+def test_read_bore_fields(bore_xml_v2: str) -> None:
+    expected = read_bore_xml(bore_xml_v2)[0]
+    bore = read_bore_xml(bore_xml_v2, fields=["final_bore_depth"])[0]
+    assert bore.final_bore_depth == expected.final_bore_depth
+    assert bore.data is None
+    assert bore.attributes()["data"] is None
+
+
+def test_read_bore_validate(bore_xml_v2: str, tmp_path) -> None:
+    xsd = "http://www.w3.org/2001/XMLSchema"
+    isbhr = "http://www.broservices.nl/xsd/isbhr-gt/2.1"
+    brocom = "http://www.broservices.nl/xsd/brocommon/3.0"
+    mirror = tmp_path / "schema.broservices.nl" / "xsd"
+    (mirror / "isbhr-gt" / "2.1").mkdir(parents=True)
+    (mirror / "brocommon" / "3.0").mkdir(parents=True)
+    # the schema is located by the xsi:schemaLocation of the file
+    (mirror / "isbhr-gt" / "2.1" / "isbhr-gt-messages.xsd").write_text(
+        f"""<xs:schema xmlns:xs="{xsd}" targetNamespace="{isbhr}"
+            xmlns:brocom="{brocom}" elementFormDefault="qualified">
+        <xs:import namespace="{brocom}"
+            schemaLocation="https://schema.broservices.nl/xsd/brocommon/3.0/brocommon.xsd"/>
+        <xs:element name="registrationRequest">
+            <xs:complexType><xs:sequence>
+                <xs:element ref="brocom:requestReference"/>
+                <xs:element ref="brocom:deliveryAccountableParty"/>
+                <xs:element ref="brocom:qualityRegime"/>
+                <xs:any processContents="skip" minOccurs="0" maxOccurs="unbounded"/>
+            </xs:sequence></xs:complexType>
+        </xs:element>
+        </xs:schema>"""
+    )
+    (mirror / "brocommon" / "3.0" / "brocommon.xsd").write_text(
+        f"""<xs:schema xmlns:xs="{xsd}" targetNamespace="{brocom}">
+        <xs:element name="requestReference" type="xs:string"/>
+        <xs:element name="deliveryAccountableParty" type="xs:string"/>
+        <xs:element name="qualityRegime">
+            <xs:simpleType><xs:restriction base="xs:string">
+                <xs:enumeration value="IMBRO"/>
+                <xs:enumeration value="IMBRO/A"/>
+            </xs:restriction></xs:simpleType>
+        </xs:element>
+        </xs:schema>"""
+    )
+
+    parsed = read_bore_xml(bore_xml_v2, validate=True, schema_dir=tmp_path)
+    assert_frame_equal(parsed[0].data, read_bore_xml(bore_xml_v2)[0].data)
+
+    with open(bore_xml_v2, "rb") as f:
+        content = f.read()
+    invalid = BytesIO(content.replace(b">IMBRO<", b">unknown<"))
+    with pytest.raises(etree.DocumentInvalid):
+        read_bore_xml(invalid, validate=True, schema_dir=tmp_path)
+    with pytest.raises(ValueError):
+        read_bore_xml(bore_xml_v2, validate=True)
@@ -1,6 +1,23 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from io import BytesIO
 
+import pytest
+from lxml import etree
+
+from pygef.broxml import resolvers
+from pygef.broxml.parse_cpt import CPT_ATTRIBS, iter_cpt
 from pygef.broxml.parse_cpt import read_cpt as read_cpt_xml
+from pygef.broxml.xml_parser import (
+    BaseParser,
+    compile_schema,
+    count_payloads,
+    find_schema_elements,
+    get_parser,
+    iter_payloads,
+    parse_root,
+)
 from pygef.common import Location
 
 
@@ -46,3 +63,270 @@ def test_cpt_attributes(cpt_xml: str) -> None:
     assert cpt.zlm_pore_pressure_u3_after is None
     assert cpt.delivered_vertical_position_offset == 4.41
     assert cpt.delivered_vertical_position_datum.name == "NAP"
+
+
+def test_cpt_depth_range(cpt_xml: str) -> None:
+    full = read_cpt_xml(cpt_xml)[0].data
+    cpt = read_cpt_xml(cpt_xml, depth_range=(2.0, 3.0))[0]
+    assert cpt.data.height > 0
+    assert cpt.data["penetrationLength"].is_between(2.0, 3.0).all()
+    assert cpt.data.equals(
+        full.filter(full["penetrationLength"].is_between(2.0, 3.0)), null_equal=True
+    )
+
+    offset = cpt.delivered_vertical_position_offset
+    cpt = read_cpt_xml(
+        cpt_xml, depth_range=(offset - 2.0, offset - 3.0), depth_reference="depthOffset"
+    )[0]
+    assert cpt.data["depth"].is_between(2.0, 3.0).all()
+
+    # the window is applied exactly on the depthOffset, also on its edges
+    offsets = full["depthOffset"]
+    for top, bottom in [(offsets[10], offsets[20]), (offsets[15], offsets[15])]:
+        cpt = read_cpt_xml(
+            cpt_xml, depth_range=(top, bottom), depth_reference="depthOffset"
+        )[0]
+        expected = full.filter(full["depthOffset"].is_between(bottom, top))
+        assert cpt.data.equals(expected, null_equal=True)
+
+
+def test_iter_cpt(cpt_xml: str) -> None:
+    with open(cpt_xml) as f:
+        content = f.read()
+    # repeat the dispatch document
+    match = re.search(
+        r"<(\w+:)?dispatchDocument.*</(\w+:)?dispatchDocument>", content, re.S
+    )
+    assert match is not None
+    many = content[: match.start()] + match.group() * 3 + content[match.end() :]
+
+    expected = read_cpt_xml(cpt_xml)[0]
+    for file in [many, BytesIO(many.encode())]:
+        parsed = list(iter_cpt(file))
+        assert len(parsed) == 3
+        for cpt in parsed:
+            assert cpt.attributes() == expected.attributes()
+            assert cpt.data.equals(expected.data, null_equal=True)
+
+    with pytest.raises(SyntaxError):
+        list(iter_cpt(content.replace("dispatchDocument", "otherDocument")))
+
+
+def test_iter_payloads_memory(cpt_xml: str) -> None:
+    with open(cpt_xml) as f:
+        content = f.read()
+    match = re.search(
+        r"<(\w+:)?dispatchDocument.*</(\w+:)?dispatchDocument>", content, re.S
+    )
+    assert match is not None
+
+    def tree_sizes(count: int) -> list[tuple[int, int]]:
+        many = content[: match.start()] + match.group() * count
+        many += content[match.end() :]
+        sizes = []
+        for payload, _ in iter_payloads(BytesIO(many.encode()), "dispatchDocument"):
+            root = payload.getroottree().getroot()
+            sizes.append((len(root), sum(1 for _ in root.iter())))
+        return sizes
+
+    # the processed dispatch documents are removed from the root, the size of the
+    # tree does not grow with the number of documents
+    sizes = tree_sizes(50)
+    assert len(sizes) == 50
+    assert max(sizes) == max(tree_sizes(5))
+    # the last processed, the current and the document read ahead by the parser
+    assert max(children for children, _ in sizes) <= 3
+
+
+def test_compile_schema(cpt_xml: str) -> None:
+    root = parse_root(cpt_xml)
+    payload = root.find("dispatchDocument", root.nsmap)[0]
+    xpaths = tuple(d["xpath"] for d in CPT_ATTRIBS.values())
+    compiled = compile_schema(xpaths, tuple(payload.nsmap.items()))
+    assert compile_schema(xpaths, tuple(payload.nsmap.items())) is compiled
+    # the zero load measurements share a single parent xpath
+    assert len(compiled) < len(xpaths)
+    assert sum(len(children) for _, children in compiled) == len(xpaths)
+
+    elements = find_schema_elements(payload, compiled)
+    for xpath, el in zip(xpaths, elements):
+        assert el is payload.find(xpath, payload.nsmap)
+
+    with pytest.raises(SyntaxError):
+        compile_schema(("./unknown:element",), tuple(payload.nsmap.items()))
+
+
+def test_read_cpt_index(cpt_xml: str) -> None:
+    with open(cpt_xml) as f:
+        content = f.read()
+    # repeat the payload of the dispatch document
+    match = re.search(r"<CPT_O.*</CPT_O>", content, re.S)
+    assert match is not None
+    many = content[: match.start()] + match.group() * 3 + content[match.end() :]
+
+    assert count_payloads(BytesIO(many.encode())) == 3
+    assert count_payloads(cpt_xml) == 1
+    expected = read_cpt_xml(cpt_xml)[0]
+    parsed = read_cpt_xml(BytesIO(many.encode()), index=2)
+    assert len(parsed) == 1
+    assert parsed[0].data.equals(expected.data, null_equal=True)
+
+    with pytest.raises(IndexError):
+        read_cpt_xml(BytesIO(many.encode()), index=3)
+    with pytest.raises(SyntaxError):
+        count_payloads(content.replace("dispatchDocument", "otherDocument"))
+
+    # the payloads of every dispatch document are counted and indexed
+    match = re.search(
+        r"<(\w+:)?dispatchDocument.*</(\w+:)?dispatchDocument>", content, re.S
+    )
+    assert match is not None
+    documents = (
+        content[: match.start()]
+        + match.group().replace("CPT000000099543", "CPT000000000001")
+        + match.group()
+        + match.group().replace("CPT000000099543", "CPT000000000003")
+        + content[match.end() :]
+    ).encode()
+    assert count_payloads(BytesIO(documents)) == 3
+    assert len(list(iter_cpt(BytesIO(documents)))) == 3
+    parsed = read_cpt_xml(BytesIO(documents))
+    assert [cpt.bro_id for cpt in parsed] == [
+        "CPT000000000001",
+        "CPT000000099543",
+        "CPT000000000003",
+    ]
+    assert read_cpt_xml(BytesIO(documents), index=2)[0].bro_id == "CPT000000000003"
+    with pytest.raises(IndexError):
+        read_cpt_xml(BytesIO(documents), index=3)
+
+
+def test_values_bytes() -> None:
+    for text in ["\n  0.1,2.0;0.2,3.0;\n  ", "0.1,2.0;", " \t\n", ""]:
+        el = etree.fromstring(f"<values>{text}</values>")
+        assert resolvers.values_bytes(el) == text.strip().encode()
+
+
+def test_parser_per_thread(cpt_xml: str) -> None:
+    assert get_parser() is get_parser()
+    assert get_parser(huge_tree=True) is not get_parser()
+    assert BaseParser is not get_parser()
+    assert parse_root(cpt_xml).getroottree().parser is get_parser()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert executor.submit(get_parser).result() is not get_parser()
+        parsed = list(executor.map(read_cpt_xml, [cpt_xml] * 4))
+    expected = read_cpt_xml(cpt_xml)[0]
+    for cpts in parsed:
+        assert cpts[0].data.equals(expected.data, null_equal=True)
+
+
+def test_read_cpt_workers(cpt_xml: str) -> None:
+    with open(cpt_xml) as f:
+        content = f.read()
+    match = re.search(r"<CPT_O.*</CPT_O>", content, re.S)
+    assert match is not None
+    # repeat the payload with a different bro id
+    payloads = "".join(
+        match.group().replace("CPT000000099543", f"CPT{i:012d}") for i in range(5)
+    )
+    many = BytesIO(
+        (content[: match.start()] + payloads + content[match.end() :]).encode()
+    )
+
+    expected = read_cpt_xml(many)
+    many.seek(0)
+    parsed = read_cpt_xml(many, workers=3)
+    assert [cpt.bro_id for cpt in parsed] == [f"CPT{i:012d}" for i in range(5)]
+    for cpt, other in zip(parsed, expected):
+        assert cpt.attributes() == other.attributes()
+        assert cpt.data.equals(other.data, null_equal=True)
+
+
+def test_read_cpt_fields(cpt_xml: str) -> None:
+    expected = read_cpt_xml(cpt_xml)[0]
+    cpt = read_cpt_xml(cpt_xml, fields=["bro_id", "delivered_location"])[0]
+    assert cpt.bro_id == expected.bro_id
+    assert cpt.delivered_location == expected.delivered_location
+    # the other fields, including the measurement data, are not resolved
+    assert cpt.data is None
+    assert cpt.research_report_date is None
+    assert cpt.attributes()["data"] is None
+    assert cpt.columns == []
+    assert cpt.lazy_data is None
+    cpt = list(iter_cpt(cpt_xml, fields=["bro_id"], lazy=True))[0]
+    assert cpt.data is None
+    assert cpt.columns == []
+
+    cpt = list(iter_cpt(cpt_xml, fields=["data"]))[0]
+    assert cpt.bro_id is None
+    # the depthOffset is only computed with the delivered_vertical_position_offset
+    assert cpt.data.equals(expected.data.drop("depthOffset"), null_equal=True)
+
+    with pytest.raises(ValueError):
+        read_cpt_xml(cpt_xml, fields=["unknown_field"])
+
+
+def test_read_cpt_validate(cpt_xml: str, tmp_path) -> None:
+    xsd = "http://www.w3.org/2001/XMLSchema"
+    dscpt = "http://www.broservices.nl/xsd/dscpt/1.1"
+    brocom = "http://www.broservices.nl/xsd/brocommon/3.0"
+    mirror = tmp_path / "schema.broservices.nl" / "xsd"
+    (mirror / "dscpt" / "1.1").mkdir(parents=True)
+    (mirror / "brocommon" / "3.0").mkdir(parents=True)
+    # the imported schema is resolved to the mirror by its url
+    (mirror / "dscpt" / "1.1" / "dscpt-messages.xsd").write_text(
+        f"""<xs:schema xmlns:xs="{xsd}" targetNamespace="{dscpt}"
+            xmlns:brocom="{brocom}" elementFormDefault="qualified">
+        <xs:import namespace="{brocom}"
+            schemaLocation="https://schema.broservices.nl/xsd/brocommon/3.0/brocommon.xsd"/>
+        <xs:element name="dispatchDataResponse">
+            <xs:complexType><xs:sequence>
+                <xs:element ref="brocom:responseType"/>
+                <xs:any processContents="skip" minOccurs="0" maxOccurs="unbounded"/>
+            </xs:sequence></xs:complexType>
+        </xs:element>
+        </xs:schema>"""
+    )
+    (mirror / "brocommon" / "3.0" / "brocommon.xsd").write_text(
+        f"""<xs:schema xmlns:xs="{xsd}" targetNamespace="{brocom}">
+        <xs:element name="responseType">
+            <xs:simpleType><xs:restriction base="xs:string">
+                <xs:enumeration value="dispatch"/>
+            </xs:restriction></xs:simpleType>
+        </xs:element>
+        </xs:schema>"""
+    )
+
+    parsed = read_cpt_xml(cpt_xml, validate=True, schema_dir=tmp_path)
+    assert parsed[0].data.equals(read_cpt_xml(cpt_xml)[0].data, null_equal=True)
+
+    with open(cpt_xml) as f:
+        content = f.read()
+    invalid = BytesIO(content.replace(">dispatch<", ">rejection<").encode())
+    with pytest.raises(etree.DocumentInvalid):
+        read_cpt_xml(invalid, validate=True, schema_dir=tmp_path)
+    with pytest.raises(ValueError):
+        read_cpt_xml(cpt_xml, validate=True)
+
+
+@pytest.mark.parametrize("decimal_sep", [",", "_"])
+def test_cpt_decimal_separator(cpt_xml: str, decimal_sep: str) -> None:
+    with open(cpt_xml) as f:
+        content = f.read().replace(
+            'decimalSeparator="." tokenSeparator=","',
+            f'decimalSeparator="{decimal_sep}" tokenSeparator="|"',
+        )
+    match = re.search(r"<cptcommon:values>(.*?)</cptcommon:values>", content, re.S)
+    assert match is not None
+    values = match.group(1).replace(",", "|").replace(".", decimal_sep)
+    content = content[: match.start(1)] + values + content[match.end(1) :]
+
+    expected = read_cpt_xml(cpt_xml)[0]
+    cpt = read_cpt_xml(BytesIO(content.encode()))[0]
+    assert cpt.data.equals(expected.data, null_equal=True)
+
+    with pytest.raises(ValueError):
+        ambiguous = content.replace(
+            'tokenSeparator="|"', f'tokenSeparator="{decimal_sep}"'
+        )
+        read_cpt_xml(BytesIO(ambiguous.encode()))